@@ -144,11 +144,24 @@ class NotionClient:
         
         await self.create_session()
         url = f"https://api.notion.com/v1/databases/{database_id}/query"
-        async with self.session.post(url) as response:
-            data = await response.json()
-            brainrot_cache['data'] = data
-            brainrot_cache['last_update'] = datetime.now()
-            return data
+        payload = {'page_size': 100}
+        results = []
+        
+        # Recorrer todas las páginas del cursor (Notion devuelve 100 como máximo)
+        while True:
+            async with self.session.post(url, json=payload) as response:
+                data = await response.json()
+            if data.get('object') == 'error':
+                raise Exception(data.get('message', 'Error consultando Notion'))
+            results.extend(data.get('results', []))
+            if not data.get('has_more') or not data.get('next_cursor'):
+                break
+            payload['start_cursor'] = data['next_cursor']
+        
+        data = {'object': 'list', 'results': results, 'has_more': False}
+        brainrot_cache['data'] = data
+        brainrot_cache['last_update'] = datetime.now()
+        return data
     
     async def get_page(self, page_id):
         if page_id in relation_cache:
@@ -179,6 +192,26 @@ def get_rareza_emoji(rareza_name):
             return emoji
     return '⚪'
 
+# Límite de peticiones simultáneas a Notion al resolver relaciones
+relation_semaphore = asyncio.Semaphore(3)
+
+async def prefetch_relations(items):
+    """Resuelve en paralelo todas las cuentas distintas de una lista de resultados"""
+    relation_ids = {
+        relation['id']
+        for item in items
+        for relation in item.get('properties', {}).get('Cuenta', {}).get('relation', [])[:1]
+    }
+    
+    async def fetch(relation_id):
+        async with relation_semaphore:
+            try:
+                await notion.get_page(relation_id)
+            except Exception as e:
+                print(f"Error obteniendo cuenta {relation_id}: {e}")
+    
+    await asyncio.gather(*(fetch(rid) for rid in relation_ids if rid not in relation_cache))
+
 async def extract_notion_property(properties, property_name, property_type):
     try:
         prop = properties.get(property_name, {})
@@ -302,6 +335,8 @@ async def brainrots(ctx, items_per_page: int = 5):
             await loading_msg.edit(content=f"{CUSTOM_EMOJIS['advertencia']} No hay Brainrots en la base de datos.")
             return
         
+        await prefetch_relations(all_brainrots)
+        
         pages = []
         items_per_page = max(1, min(items_per_page, 5))
         
@@ -0,0 +1,103 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from typing import Any, Dict, List, Optional
+from models.brainrot import BrainrotCollection
+from utils.cache import Snapshot
+from views.filters import complete_choices
+from utils import emojis, formatters
+
+class AccountCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @commands.command()
+    async def cuenta(self, ctx: commands.Context, *, nombre: str = ''):
+        """Resumen de una cuenta, o de todas si no se indica nombre"""
+        try:
+            await ctx.send(embed=await self.build_account(nombre))
+        except Exception as e:
+            print(f"Error en cuenta: {e}")
+            await ctx.send(f"{emojis.get_emoji('error')} Error al cargar las cuentas.")
+    
+    @app_commands.command(name="account", description="Resumen por cuenta de juego")
+    @app_commands.describe(nombre="Cuenta; vacío para ver todas")
+    async def account_slash(self, interaction: discord.Interaction, nombre: Optional[str] = None):
+        await interaction.response.defer(thinking=True)
+        try:
+            await interaction.followup.send(embed=await self.build_account(nombre or ''))
+        except Exception as e:
+            print(f"Error en /account: {e}")
+            await interaction.followup.send(f"{emojis.get_emoji('error')} Error al cargar las cuentas.")
+    
+    @account_slash.autocomplete('nombre')
+    async def nombre_autocomplete(self, interaction: discord.Interaction, current: str):
+        return complete_choices('cuenta', current)
+    
+    async def build_account(self, nombre: str) -> discord.Embed:
+        collection = await BrainrotCollection.load()
+        # Una sola carga en bloque de los nombres; los agregados ya vienen calculados con la copia
+        cuentas = await collection.get_cuentas()
+        if not nombre:
+            return self.create_overview_embed(list(cuentas.values()), collection.snapshot)
+        
+        text = nombre.lower()
+        matches = ([c for c in cuentas.values() if c['nombre'].lower() == text] or
+                   [c for c in cuentas.values() if text in c['nombre'].lower()])
+        if len(matches) != 1:
+            return self.create_overview_embed(matches, collection.snapshot, nombre)
+        
+        cuenta = matches[0]
+        top = collection.snapshot.leaderboard.top(5, vendido=False, cuenta_ids=[cuenta['id']])
+        return self.create_account_embed(cuenta, top, collection.snapshot)
+    
+    def create_overview_embed(self, cuentas: List[Dict[str, Any]], snapshot: Snapshot,
+                              nombre: str = '') -> discord.Embed:
+        if nombre:
+            description = (f"Varias cuentas coinciden con `{nombre}`:" if cuentas
+                           else f"{emojis.get_emoji('advertencia')} Ninguna cuenta coincide con `{nombre}`.")
+        else:
+            description = f"{len(cuentas)} cuentas, ordenadas por ingresos disponibles"
+        
+        embed = discord.Embed(
+            title=f"{emojis.get_emoji('cuenta')} **CUENTAS**",
+            description=description,
+            color=0x1E90FF
+        )
+        for cuenta in cuentas[:25]:
+            embed.add_field(name=cuenta['nombre'][:256], value=(
+                f"{emojis.get_emoji('brainrot')} **{cuenta['total']}** • "
+                f"{emojis.get_emoji('dinero')} **{formatters.format_price(cuenta['disponible_value'])}** • "
+                f"{emojis.get_emoji('vendido')} {cuenta['vendidos']} vendidos"
+            ), inline=False)
+        formatters.set_snapshot_footer(embed, snapshot)
+        return embed
+    
+    def create_account_embed(self, cuenta: Dict[str, Any], top: list, snapshot: Snapshot) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"{emojis.get_emoji('cuenta')} **{cuenta['nombre'][:200]}**",
+            color=0x1E90FF
+        )
+        embed.add_field(name=f"{emojis.get_emoji('brainrot')} Brainrots", value=f"**{cuenta['total']}**", inline=True)
+        embed.add_field(name=f"{emojis.get_emoji('dinero')} Ingresos disponibles",
+                        value=f"**{formatters.format_price(cuenta['disponible_value'])}**", inline=True)
+        embed.add_field(name=f"{emojis.get_emoji('estadisticas')} Valor total",
+                        value=f"**{formatters.format_price(cuenta['total_value'])}**", inline=True)
+        
+        disponibilidad = (f"{emojis.get_emoji('disponible')} Disponibles: **{cuenta['disponibles']}**\n"
+                          f"{emojis.get_emoji('vendido')} Vendidos: **{cuenta['vendidos']}**")
+        embed.add_field(name=f"{emojis.get_emoji('info')} Disponibilidad", value=disponibilidad, inline=True)
+        
+        rarezas = "\n".join(f"{emojis.get_rareza_emoji(rareza)} {rareza}: **{count}**"
+                            for rareza, count in cuenta['rarezas'][:10])
+        embed.add_field(name=f"{emojis.get_emoji('rareza')} Rarezas", value=rarezas or "No data", inline=True)
+        
+        top_text = "\n".join(f"**{position}.** {br.name} — {formatters.format_price(br.price)}"
+                             for position, br in enumerate(top, 1))
+        embed.add_field(name=f"{emojis.get_emoji('fuego')} Más rentables disponibles",
+                        value=top_text[:1024] or "No data", inline=False)
+        formatters.set_snapshot_footer(embed, snapshot)
+        return embed
+
+async def setup(bot):
+    await bot.add_cog(AccountCommands(bot))
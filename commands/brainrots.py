@@ -1,49 +1,32 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
-from models.brainrot import BrainrotCollection
+from typing import Awaitable, Callable, Optional, Tuple
+from models.brainrot import BrainrotCollection, resolve_cuentas
+from services.search import SearchQuery
+from services.query import query_planner
+from utils.cache import Snapshot, cache_manager
 from views.pagination import AdvancedPaginationView
+from views.packer import EMBED_MAX_FIELDS, field_size, fit_field
+from views.filters import complete_choices, parse_search_query, parse_sort
 from utils import emojis, formatters
 
 class BrainrotCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.collection = BrainrotCollection()
     
     @commands.command()
-    async def brainrots(self, ctx: commands.Context, items_per_page: int = 5):
+    async def brainrots(self, ctx: commands.Context, items_per_page: int = EMBED_MAX_FIELDS):
         """Muestra Brainrots con paginación"""
         try:
             loading_msg = await ctx.send(f"{emojis.get_emoji('cargando')} Cargando Brainrots...")
             
-            # Cargar datos
-            data = await self.collection.load_from_notion()
-            all_brainrots = self.collection.get_all()
+            async def send(**kwargs):
+                await loading_msg.delete()
+                return await ctx.send(**kwargs)
             
-            if not all_brainrots:
+            if not await self.send_brainrots(send, items_per_page):
                 await loading_msg.edit(content=f"{emojis.get_emoji('advertencia')} No hay Brainrots.")
-                return
-            
-            # Crear páginas
-            pages = []
-            items_per_page = max(1, min(items_per_page, 5))
-            
-            for i in range(0, len(all_brainrots), items_per_page):
-                page_brainrots = all_brainrots[i:i + items_per_page]
-                embed = await self.create_brainrot_embed(page_brainrots)
-                pages.append(embed)
-            
-            await loading_msg.delete()
-            
-            if pages:
-                view = AdvancedPaginationView(pages)
-                first_embed = pages[0]
-                first_embed.set_footer(
-                    text=f"{emojis.get_emoji('reloj')} Página 1/{len(pages)} • "
-                         f"{emojis.get_emoji('brainrot')} Total: {len(all_brainrots)}"
-                )
-                await ctx.send(embed=first_embed, view=view)
-            else:
-                await ctx.send(f"{emojis.get_emoji('advertencia')} No hay datos para mostrar.")
             
         except Exception as e:
             print(f"Error en brainrots: {e}")
@@ -52,7 +35,128 @@ class BrainrotCommands(commands.Cog):
             except:
                 pass  # Evitar errores en cascada
     
-    async def create_brainrot_embed(self, brainrots: list) -> discord.Embed:
+    @app_commands.command(name="brainrots", description="Muestra la colección de Brainrots")
+    @app_commands.describe(por_pagina="Máximo de Brainrots por página (1-25)")
+    async def brainrots_slash(self, interaction: discord.Interaction,
+                              por_pagina: app_commands.Range[int, 1, EMBED_MAX_FIELDS] = EMBED_MAX_FIELDS):
+        # Diferir primero: la carga puede superar los 3 s que da Discord
+        await interaction.response.defer(thinking=True)
+        try:
+            async def send(**kwargs):
+                return await interaction.followup.send(wait=True, **kwargs)
+            
+            if not await self.send_brainrots(send, por_pagina):
+                await interaction.followup.send(f"{emojis.get_emoji('advertencia')} No hay Brainrots.")
+        except Exception as e:
+            print(f"Error en /brainrots: {e}")
+            await interaction.followup.send(f"{emojis.get_emoji('error')} Error al cargar los datos.")
+    
+    async def send_brainrots(self, send: Callable[..., Awaitable[discord.Message]],
+                             items_per_page: int) -> bool:
+        """Envía la primera página en cuanto llega el primer lote; devuelve si había datos"""
+        records = []
+        batches = 0
+        view = None
+        
+        async for batch in BrainrotCollection.stream_from_notion():
+            records.extend(batch)
+            batches += 1
+            
+            if view is None and records:
+                # Un lote que es la copia entera sale de la caché: el aviso es el de esa copia
+                cached = cache_manager.snapshot
+                snapshot = cached if cached is not None and batch is cached.records else None
+                view = self.create_view(records, snapshot, items_per_page)
+                view.message = await send(embed=view.prepare_page(), view=view)
+        
+        if view is None:
+            return False
+        
+        # Actualizar botones y total una vez cargado todo
+        if batches > 1:
+            await view.message.edit(embed=view.prepare_page(), view=view)
+        return True
+    
+    @commands.command()
+    async def buscar(self, ctx: commands.Context, *, consulta: str = ''):
+        """Busca Brainrots: nombre rareza:x efecto:y cuenta:z vendido:si/no precio:min-max"""
+        try:
+            results, snapshot = await self.run_search(parse_search_query(consulta))
+            
+            if not results:
+                await ctx.send(f"{emojis.get_emoji('buscar')} Sin resultados para `{consulta}`.")
+                return
+            
+            view = self.create_view(results, snapshot)
+            view.message = await ctx.send(embed=view.prepare_page(), view=view)
+        
+        except Exception as e:
+            print(f"Error en buscar: {e}")
+            await ctx.send(f"{emojis.get_emoji('error')} Error al buscar.")
+    
+    @app_commands.command(name="search", description="Busca Brainrots por nombre y filtros")
+    @app_commands.describe(nombre="Nombre o parte del nombre", rareza="Rareza", efecto="Efecto",
+                           cuenta="Cuenta", vendido="Filtrar por vendidos o disponibles",
+                           precio_min="Dinero / segundo mínimo", precio_max="Dinero / segundo máximo",
+                           orden="Orden de los resultados")
+    @app_commands.choices(orden=[
+        app_commands.Choice(name="Precio (mayor primero)", value="-precio"),
+        app_commands.Choice(name="Precio (menor primero)", value="precio"),
+        app_commands.Choice(name="Nombre", value="nombre"),
+    ])
+    async def search_slash(self, interaction: discord.Interaction, nombre: str = '',
+                           rareza: Optional[str] = None, efecto: Optional[str] = None,
+                           cuenta: Optional[str] = None, vendido: Optional[bool] = None,
+                           precio_min: Optional[float] = None, precio_max: Optional[float] = None,
+                           orden: Optional[app_commands.Choice[str]] = None):
+        await interaction.response.defer(thinking=True)
+        try:
+            query = SearchQuery(nombre, rareza, efecto, cuenta, vendido, precio_min, precio_max)
+            if orden:
+                query.sort, query.descending = parse_sort(orden.value)
+            results, snapshot = await self.run_search(query)
+            
+            if not results:
+                await interaction.followup.send(f"{emojis.get_emoji('buscar')} Sin resultados.")
+                return
+            
+            view = self.create_view(results, snapshot)
+            view.message = await interaction.followup.send(embed=view.prepare_page(), view=view, wait=True)
+        except Exception as e:
+            print(f"Error en /search: {e}")
+            await interaction.followup.send(f"{emojis.get_emoji('error')} Error al buscar.")
+    
+    def create_view(self, records: list, snapshot: Optional[Snapshot],
+                    items_per_page: int = EMBED_MAX_FIELDS) -> AdvancedPaginationView:
+        # Las páginas se llenan hasta los límites del embed midiendo cada campo ya formateado
+        return AdvancedPaginationView(records, self.create_brainrot_embed, items_per_page,
+                                      notice=formatters.snapshot_notice(snapshot),
+                                      measure=lambda br: field_size(*formatters.format_brainrot_field(br)),
+                                      label=lambda br: br.name)
+    
+    async def run_search(self, query: SearchQuery) -> Tuple[list, Optional[Snapshot]]:
+        results, snapshot = await query_planner.execute(query)
+        if results:
+            await resolve_cuentas(results)
+        return results, snapshot
+    
+    @search_slash.autocomplete('nombre')
+    async def nombre_autocomplete(self, interaction: discord.Interaction, current: str):
+        return complete_choices('name', current)
+    
+    @search_slash.autocomplete('rareza')
+    async def rareza_autocomplete(self, interaction: discord.Interaction, current: str):
+        return complete_choices('rareza', current)
+    
+    @search_slash.autocomplete('efecto')
+    async def efecto_autocomplete(self, interaction: discord.Interaction, current: str):
+        return complete_choices('efecto', current)
+    
+    @search_slash.autocomplete('cuenta')
+    async def cuenta_autocomplete(self, interaction: discord.Interaction, current: str):
+        return complete_choices('cuenta', current)
+    
+    def create_brainrot_embed(self, brainrots: list) -> discord.Embed:
         embed = discord.Embed(
             title=f"{emojis.get_emoji('brainrot')} **BRAINROTS**", 
             color=0x00ffaa
@@ -60,23 +164,8 @@ class BrainrotCommands(commands.Cog):
         
         for brainrot in brainrots:
             try:
-                nombre = await brainrot.get_name()
-                precio = await brainrot.get_price()
-                rarezas = await brainrot.get_rarezas()
-                efectos = await brainrot.get_efectos()
-                vendido = await brainrot.is_vendido()
-                cuenta = await brainrot.get_cuenta()
-                
-                field_value = f"{emojis.get_emoji('dinero')} **{precio}**\n"
-                field_value += f"{emojis.get_emoji('rareza')} **{formatters.format_rareza_list(rarezas)}**\n"
-                field_value += f"{emojis.get_emoji('efectos')} **{formatters.format_efectos_list(efectos)}**\n"
-                
-                status_emoji, status_text = formatters.format_status(vendido)
-                field_value += f"{status_emoji} **{status_text}**\n"
-                field_value += f"{emojis.get_emoji('cuenta')} **{cuenta}**"
-                
-                embed.add_field(name=f"**{nombre}**", value=field_value, inline=False)
-                embed.add_field(name="\u200b", value="▬" * 30, inline=False)
+                name, value = fit_field(*formatters.format_brainrot_field(brainrot))
+                embed.add_field(name=name, value=value, inline=False)
                 
             except Exception as e:
                 print(f"Error procesando brainrot: {e}")
@@ -85,4 +174,4 @@ class BrainrotCommands(commands.Cog):
         return embed
 
 async def setup(bot):
-    await bot.add_cog(BrainrotCommands(bot))
\ No newline at end of file
+    await bot.add_cog(BrainrotCommands(bot))
@@ -1,20 +1,94 @@
 import discord
+from datetime import datetime
+from discord import app_commands
 from discord.ext import commands
 from models.brainrot import BrainrotCollection
-from utils import emojis
+from services.notion_client import notion_client
+from utils.cache import Snapshot
+from utils import emojis, formatters
 
 class DashboardCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.collection = BrainrotCollection()
 
     @commands.command()
     async def dashboard(self, ctx: commands.Context):
         """Muestra el dashboard de estadísticas"""
         try:
-            await ctx.send(f"{emojis.get_emoji('cargando')} Generando dashboard...")
+            await ctx.send(embed=await self.build_dashboard())
         except Exception as e:
             await ctx.send(f"{emojis.get_emoji('error')} Error: {str(e)}")
+    
+    @app_commands.command(name="dashboard", description="Estadísticas de la colección")
+    async def dashboard_slash(self, interaction: discord.Interaction):
+        await interaction.response.defer(thinking=True)
+        try:
+            await interaction.followup.send(embed=await self.build_dashboard())
+        except Exception as e:
+            await interaction.followup.send(f"{emojis.get_emoji('error')} Error: {str(e)}")
+    
+    async def build_dashboard(self) -> discord.Embed:
+        collection = await BrainrotCollection.load()
+        stats = collection.get_stats()
+        await notion_client.resolve_relations(cuenta_id for cuenta_id, _ in stats['cuentas'][:3])
+        return self.create_dashboard_embed(stats, collection.get_analytics(), collection.snapshot)
+    
+    def create_dashboard_embed(self, stats: dict, analytics: dict, snapshot: Snapshot) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"{emojis.get_emoji('dashboard')} **DASHBOARD BRAINROTS**",
+            description=f"{emojis.get_emoji('cohete')} Estadísticas completas de tu colección",
+            color=0x9370DB,
+            timestamp=datetime.now()
+        )
+        
+        embed.add_field(name=f"{emojis.get_emoji('brainrot')} Total Brainrots", value=f"**{stats['total']}**", inline=True)
+        embed.add_field(name=f"{emojis.get_emoji('dinero')} Valor Total", value=f"**{formatters.format_price(stats['total_value'])}**", inline=True)
+        embed.add_field(name=f"{emojis.get_emoji('vendido')} Vendidos", value=f"**{stats['vendidos']}**", inline=True)
+        
+        rareza_text = "\n".join(f"{emojis.get_rareza_emoji(k)} {k}: **{v}**" for k, v in stats['rarezas'][:3])
+        embed.add_field(name=f"{emojis.get_emoji('rareza')} Top Rarezas", value=rareza_text or "No data", inline=False)
+        
+        if stats['efectos']:
+            efecto, count = stats['efectos'][0]
+            embed.add_field(name=f"{emojis.get_emoji('efectos')} Efecto Más Común",
+                            value=f"{emojis.get_efecto_emoji(efecto)} {efecto}: **{count}**", inline=True)
+        
+        disponibilidad = (f"{emojis.get_emoji('disponible')} Disponibles: **{stats['disponibles']}**\n"
+                          f"{emojis.get_emoji('vendido')} Vendidos: **{stats['vendidos']}**")
+        embed.add_field(name=f"{emojis.get_emoji('info')} Disponibilidad", value=disponibilidad, inline=True)
+        
+        percentiles = "\n".join(f"P{p}: **{formatters.format_price(v)}**"
+                                for p, v in analytics['percentiles'].items() if v is not None)
+        embed.add_field(name=f"{emojis.get_emoji('estadisticas')} Percentiles de precio", value=percentiles or "No data", inline=True)
+        
+        histogram = analytics['histogram']
+        peak = max((count for _, _, count in histogram), default=0)
+        histogram_text = "\n".join(
+            f"`{'█' * round(10 * count / peak):<10}` {formatters.format_price(low)} – {formatters.format_price(high)}: **{count}**"
+            for low, high, count in histogram
+        ) if peak else ""
+        embed.add_field(name=f"{emojis.get_emoji('estadisticas')} Distribución de precios", value=histogram_text or "No data", inline=False)
+        
+        medias_rareza = "\n".join(f"{emojis.get_rareza_emoji(k)} {k}: **{formatters.format_price(mean)}**"
+                                   for k, mean, _ in analytics['rarezas'][:5])
+        embed.add_field(name=f"{emojis.get_emoji('rareza')} Media por rareza", value=medias_rareza or "No data", inline=True)
+        
+        medias_efecto = "\n".join(f"{emojis.get_efecto_emoji(k)} {k}: **{formatters.format_price(mean)}**"
+                                   for k, mean, _ in analytics['efectos'][:5])
+        embed.add_field(name=f"{emojis.get_emoji('efectos')} Media por efecto", value=medias_efecto or "No data", inline=True)
+        
+        crosstab = "\n".join(f"{emojis.get_rareza_emoji(k)} {k}: {emojis.get_emoji('disponible')} **{disponibles}** / "
+                              f"{emojis.get_emoji('vendido')} **{vendidos}**"
+                              for k, disponibles, vendidos in analytics['crosstab'][:5])
+        embed.add_field(name=f"{emojis.get_emoji('info')} Rareza por estado", value=crosstab or "No data", inline=False)
+        
+        cuentas_text = "\n".join(f"{emojis.get_emoji('cuenta')} {notion_client.relation_name(cuenta_id)}: **{formatters.format_price(value)}**"
+                                 for cuenta_id, value in stats['cuentas'][:3])
+        embed.add_field(name=f"{emojis.get_emoji('cuenta')} Top Cuentas", value=cuentas_text or "No data", inline=False)
+        
+        footer = f"{emojis.get_emoji('fuego')} Usa !brainrots para ver la lista completa"
+        formatters.set_snapshot_footer(embed, snapshot, footer)
+        return embed
 
 async def setup(bot):
-    await bot.add_cog(DashboardCommands(bot))
\ No newline at end of file
+    await bot.add_cog(DashboardCommands(bot))
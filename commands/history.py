@@ -0,0 +1,123 @@
+import asyncio
+import time
+import discord
+from discord.ext import commands
+from typing import List, Sequence
+from models.brainrot import BrainrotCollection
+from utils.history import history_store, SOLD, REMOVED
+from utils import emojis, formatters
+
+SPARKS = '▁▂▃▄▅▆▇█'
+MAX_POINTS = 30
+MAX_DAYS = 365
+
+def sparkline(values: Sequence[float]) -> str:
+    if not values:
+        return ''
+    low, high = min(values), max(values)
+    if high == low:
+        return SPARKS[0] * len(values)
+    return ''.join(SPARKS[round((value - low) / (high - low) * (len(SPARKS) - 1))] for value in values)
+
+def downsample(points: list, max_points: int = MAX_POINTS) -> list:
+    """Último punto de cada tramo, para que la gráfica no dependa de cuántas sincronizaciones hubo"""
+    if len(points) <= max_points:
+        return points
+    step = len(points) / max_points
+    return [points[min(len(points) - 1, int((i + 1) * step) - 1)] for i in range(max_points)]
+
+def format_change(old: float, new: float, price: bool = False) -> str:
+    change = new - old
+    text = formatters.format_price(change) if price else f"{change:+,.0f}"
+    if price and change >= 0:
+        text = f"+{text}"
+    if old:
+        text += f" ({change / old:+.1%})"
+    return text
+
+class HistoryCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @commands.command()
+    async def historial(self, ctx: commands.Context, *, consulta: str = ''):
+        """Evolución de la colección (!historial [días]) o del precio de un Brainrot (!historial <nombre>)"""
+        try:
+            consulta = consulta.strip()
+            if not consulta or consulta.isdigit():
+                embed = await self.build_trend(int(consulta or 7))
+            else:
+                embed = await self.build_page_history(consulta)
+            await ctx.send(embed=embed)
+        except Exception as e:
+            print(f"Error en historial: {e}")
+            await ctx.send(f"{emojis.get_emoji('error')} Error al leer el histórico.")
+    
+    async def build_trend(self, days: int) -> discord.Embed:
+        days = max(1, min(days, MAX_DAYS))
+        # Búsqueda por fecha y lectura del fichero proyectado en memoria, fuera del bucle
+        points = await asyncio.to_thread(history_store.totals, int(time.time()) - days * 86400)
+        embed = discord.Embed(
+            title=f"{emojis.get_emoji('estadisticas')} **HISTORIAL ({days} días)**",
+            color=0x9370DB
+        )
+        if not points:
+            embed.description = f"{emojis.get_emoji('advertencia')} Aún no hay histórico para este periodo."
+            return embed
+        
+        first, last = points[0], points[-1]
+        _, total_old, vendidos_old, disponible_old, _ = first
+        _, total_new, vendidos_new, disponible_new, _ = last
+        embed.description = f"Desde <t:{first[0]}:f> • {len(points)} sincronizaciones"
+        
+        sampled = downsample(points)
+        embed.add_field(name=f"{emojis.get_emoji('dinero')} Ingresos disponibles", value=(
+            f"**{formatters.format_price(disponible_new)}** ({format_change(disponible_old, disponible_new, price=True)})\n"
+            f"`{sparkline([point[3] for point in sampled])}`"
+        ), inline=False)
+        embed.add_field(name=f"{emojis.get_emoji('vendido')} Vendidos", value=(
+            f"**{vendidos_new}** ({format_change(vendidos_old, vendidos_new)})\n"
+            f"`{sparkline([point[2] for point in sampled])}`"
+        ), inline=True)
+        embed.add_field(name=f"{emojis.get_emoji('brainrot')} Brainrots", value=(
+            f"**{total_new}** ({format_change(total_old, total_new)})\n"
+            f"`{sparkline([point[1] for point in sampled])}`"
+        ), inline=True)
+        return embed
+    
+    async def build_page_history(self, nombre: str) -> discord.Embed:
+        collection = await BrainrotCollection.load()
+        results = collection.filter_by_name(nombre)
+        if not results:
+            return discord.Embed(description=f"{emojis.get_emoji('buscar')} Sin resultados para `{nombre}`.")
+        
+        brainrot = results[0]
+        history = await asyncio.to_thread(history_store.page_history, brainrot.id)
+        embed = discord.Embed(
+            title=f"{emojis.get_emoji('estadisticas')} **{brainrot.name[:200]}**",
+            color=0x9370DB
+        )
+        if not history:
+            embed.description = f"{emojis.get_emoji('advertencia')} Aún no hay histórico de este Brainrot."
+            return embed
+        
+        prices = [price for _, price, flags in history if price is not None and not flags & REMOVED]
+        if len(prices) > 1:
+            embed.description = f"`{sparkline(downsample(prices))}`"
+        
+        lines: List[str] = []
+        for timestamp, price, flags in history[-10:]:
+            if flags & REMOVED:
+                estado = "Eliminado"
+            else:
+                status_emoji, status_text = formatters.format_status(bool(flags & SOLD))
+                estado = f"{status_emoji} {status_text}"
+            precio = formatters.format_price(price) if price is not None else 'N/A'
+            lines.append(f"<t:{timestamp}:d> **{precio}** • {estado}")
+        embed.add_field(name=f"{emojis.get_emoji('reloj')} Últimos cambios", value="\n".join(lines), inline=False)
+        if len(results) > 1:
+            embed.set_footer(text=f"{len(results) - 1} Brainrots más coinciden con '{nombre}'")
+        return embed
+
+async def setup(bot):
+    await bot.add_cog(HistoryCommands(bot))
@@ -0,0 +1,83 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from typing import Optional
+from models.brainrot import BrainrotCollection, resolve_cuentas
+from services.search import SearchQuery
+from utils.cache import Snapshot
+from views.filters import complete_choices, parse_search_query
+from utils import emojis, formatters
+
+MAX_TOP = 25
+
+class LeaderboardCommands(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @commands.command()
+    async def top(self, ctx: commands.Context, *, consulta: str = ''):
+        """Los Brainrots más rentables: !top [n] rareza:x vendido:no cuenta:z orden:precio"""
+        try:
+            count, _, rest = consulta.partition(' ')
+            if count.isdigit():
+                k, consulta = int(count), rest
+            else:
+                k = 10
+            await ctx.send(embed=await self.build_top(parse_search_query(consulta), k))
+        except Exception as e:
+            print(f"Error en top: {e}")
+            await ctx.send(f"{emojis.get_emoji('error')} Error al calcular la clasificación.")
+    
+    @app_commands.command(name="top", description="Clasificación de Brainrots por dinero / segundo")
+    @app_commands.describe(cantidad="Cuántos mostrar (1-25)", rareza="Rareza", vendido="Filtrar por vendidos o disponibles",
+                           cuenta="Cuenta", baratos="Mostrar los más baratos en lugar de los más rentables")
+    async def top_slash(self, interaction: discord.Interaction,
+                        cantidad: app_commands.Range[int, 1, MAX_TOP] = 10,
+                        rareza: Optional[str] = None, vendido: Optional[bool] = None,
+                        cuenta: Optional[str] = None, baratos: bool = False):
+        await interaction.response.defer(thinking=True)
+        try:
+            query = SearchQuery(rareza=rareza, cuenta=cuenta, vendido=vendido,
+                                sort='price', descending=not baratos)
+            await interaction.followup.send(embed=await self.build_top(query, cantidad))
+        except Exception as e:
+            print(f"Error en /top: {e}")
+            await interaction.followup.send(f"{emojis.get_emoji('error')} Error al calcular la clasificación.")
+    
+    async def build_top(self, query: SearchQuery, k: int) -> discord.Embed:
+        k = max(1, min(k, MAX_TOP))
+        collection = await BrainrotCollection.load()
+        results = await collection.top(query, k)
+        await resolve_cuentas(results)
+        return self.create_top_embed(results, query, collection.snapshot)
+    
+    def create_top_embed(self, results: list, query: SearchQuery, snapshot: Snapshot) -> discord.Embed:
+        cheapest = query.sort == 'price' and not query.descending
+        title = "MÁS BARATOS" if cheapest else "MÁS RENTABLES"
+        filters = [value for value in (query.rareza, query.efecto, query.cuenta) if value]
+        if query.vendido is not None:
+            filters.append("vendidos" if query.vendido else "disponibles")
+        
+        lines = [f"**{position}.** {br.name} — {formatters.format_price(br.price)} • "
+                 f"{formatters.format_rareza_list(br.rarezas)} • {emojis.get_emoji('cuenta')} {br.get_cuenta()}"
+                 for position, br in enumerate(results, 1)]
+        embed = discord.Embed(
+            title=f"{emojis.get_emoji('top')} **TOP {len(results)} {title}**",
+            description="\n".join(lines)[:4096] or "Sin resultados.",
+            color=0xFFD700
+        )
+        
+        footer = f"Filtros: {', '.join(filters)}" if filters else "Toda la colección"
+        formatters.set_snapshot_footer(embed, snapshot, footer)
+        return embed
+    
+    @top_slash.autocomplete('rareza')
+    async def rareza_autocomplete(self, interaction: discord.Interaction, current: str):
+        return complete_choices('rareza', current)
+    
+    @top_slash.autocomplete('cuenta')
+    async def cuenta_autocomplete(self, interaction: discord.Interaction, current: str):
+        return complete_choices('cuenta', current)
+
+async def setup(bot):
+    await bot.add_cog(LeaderboardCommands(bot))
@@ -1,6 +1,10 @@
 import discord
 from discord.ext import commands
+from services.notion_client import notion_client, rate_limiter
+from services.query import query_planner
 from utils import emojis
+from utils.render_cache import field_cache
+from utils.singleflight import request_coalescer
 
 class UtilityCommands(commands.Cog):
     def __init__(self, bot):
@@ -12,6 +16,47 @@ class UtilityCommands(commands.Cog):
         latency = round(self.bot.latency * 1000)
         await ctx.send(f"{emojis.get_emoji('exito')} **Pong!** {emojis.get_emoji('reloj')} Latencia: {latency}ms")
 
+    @commands.command()
+    async def estado(self, ctx: commands.Context):
+        """Métricas de las peticiones a Notion y de las cachés"""
+        embed = discord.Embed(title=f"{emojis.get_emoji('estadisticas')} **ESTADO**", color=0x00FFFF)
+        
+        limiter = rate_limiter.get_stats()
+        embed.add_field(name="Notion", value=(
+            f"Peticiones: **{limiter['requests']:.0f}** • En cola: **{limiter['queued']}**\n"
+            f"Espera total: **{limiter['wait_seconds']:.1f} s**\n"
+            f"429: **{limiter['rate_limited']:.0f}** • Reintentos: **{limiter['retries']:.0f}** • "
+            f"Errores: **{limiter['errors']:.0f}**"
+        ), inline=False)
+        
+        pool = notion_client.transport.get_stats()
+        embed.add_field(name="Conexiones", value=(
+            f"Activas: **{pool['active']}**/{pool['limit']} • Libres: **{pool['idle']}**\n"
+            f"Nuevas: **{pool['connections_created']:.0f}** • Reutilizadas: **{pool['connections_reused']:.0f}**\n"
+            f"Esperas por conexión: **{pool['acquire_waits']:.0f}** ({pool['acquire_wait_seconds']:.2f} s)"
+        ), inline=False)
+        
+        totals = {'hits': 0, 'misses': 0, 'coalesced': 0}
+        for counters in request_coalescer.get_stats().values():
+            for key in totals:
+                totals[key] += counters[key]
+        embed.add_field(name="Peticiones agrupadas", value=(
+            f"Aciertos: **{totals['hits']}** • Fallos: **{totals['misses']}** • "
+            f"Agrupadas: **{totals['coalesced']}**"
+        ), inline=False)
+        
+        fields = field_cache.get_stats()
+        embed.add_field(name="Campos renderizados", value=(
+            f"Entradas: **{fields['entries']}** ({fields['bytes'] // 1024} KiB) • "
+            f"Aciertos: **{fields['hits']}** • Fallos: **{fields['misses']}**"
+        ), inline=False)
+        
+        plans = query_planner.stats
+        embed.add_field(name="Búsquedas", value=(
+            f"Copia local: **{plans['local']}** • Filtradas en Notion: **{plans['notion']}**"
+        ), inline=False)
+        await ctx.send(embed=embed)
+    
     @commands.command()
     async def ayuda(self, ctx: commands.Context):
         """Muestra ayuda"""
@@ -21,8 +66,14 @@ class UtilityCommands(commands.Cog):
             color=0x00FFFF
         )
         embed.add_field(name="!brainrots", value="Muestra la colección", inline=False)
+        embed.add_field(name="!buscar <texto>", value="Busca por nombre y filtros (rareza: efecto: cuenta: vendido: precio: orden:)", inline=False)
         embed.add_field(name="!dashboard", value="Estadísticas", inline=False)
+        embed.add_field(name="!top [n] <filtros>", value="Los más rentables (orden:precio para los más baratos)", inline=False)
+        embed.add_field(name="!cuenta [nombre]", value="Resumen por cuenta (sin nombre, todas)", inline=False)
+        embed.add_field(name="!historial [días | nombre]", value="Evolución de ingresos y ventas, o del precio de un Brainrot", inline=False)
         embed.add_field(name="!ping", value="Prueba de conexión", inline=False)
+        embed.add_field(name="!estado", value="Métricas de Notion y cachés", inline=False)
+        embed.add_field(name="/brainrots /search /dashboard /top /account", value="Versiones slash con autocompletado", inline=False)
         await ctx.send(embed=embed)
 
 async def setup(bot):
@@ -7,10 +7,57 @@ class Config:
     DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
     NOTION_TOKEN = os.getenv('NOTION_TOKEN')
     NOTION_DATABASE_ID = os.getenv('NOTION_DATABASE_ID')
+    # Opcional: base de datos de cuentas para resolver la relación 'Cuenta' en bloque
+    NOTION_ACCOUNTS_DATABASE_ID = os.getenv('NOTION_ACCOUNTS_DATABASE_ID')
     
     # Configuración de caché
     CACHE_DURATION_MINUTES = 30
+    # Servir la última copia caducada mientras se refresca en segundo plano
+    CACHE_STALE_WHILE_REVALIDATE = True
+    # Retardo aleatorio máximo antes de cada refresco periódico
+    REFRESH_JITTER_SECONDS = 60
+    # Cada cuánto se descarga todo para detectar páginas borradas o archivadas
+    SYNC_FULL_RECONCILE_MINUTES = 360
+    RELATION_CACHE_TTL_MINUTES = 120
+    RELATION_CACHE_MAX_ENTRIES = 2000
     ITEMS_PER_PAGE = 5
+    # Memoria máxima para los campos de embed ya formateados
+    FIELD_CACHE_MAX_BYTES = 4 * 1024 * 1024
+    
+    # Copia local para arrancar sin esperar a Notion
+    SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'brainrot_snapshot.db')
+    # Histórico de precios y ventas: resolución completa la última semana, por horas
+    # hasta un mes y por días a partir de ahí
+    HISTORY_PATH = os.getenv('HISTORY_PATH', 'brainrot_history')
+    HISTORY_FULL_RESOLUTION_DAYS = 7
+    HISTORY_HOURLY_DAYS = 30
+    HISTORY_COMPACT_HOURS = 24
+    
+    # Notion devuelve como máximo 100 resultados por petición
+    NOTION_PAGE_SIZE = 100
+    # Peticiones simultáneas a Notion (límite medio de ~3 req/s)
+    NOTION_MAX_CONCURRENCY = 3
+    NOTION_RATE_LIMIT_PER_SECOND = 3
+    NOTION_RATE_LIMIT_BURST = 3
+    NOTION_MAX_RETRIES = 4
+    NOTION_BACKOFF_BASE_SECONDS = 0.5
+    NOTION_BACKOFF_MAX_SECONDS = 30
+    # Plazo por petición y plazo total (con reintentos) para los comandos de usuario
+    NOTION_REQUEST_TIMEOUT_SECONDS = 10
+    NOTION_INTERACTIVE_DEADLINE_SECONDS = 8
+    NOTION_CONNECT_TIMEOUT_SECONDS = 5
+    NOTION_READ_TIMEOUT_SECONDS = 10
+    # Pool de conexiones: se reutilizan las conexiones TLS ya abiertas
+    NOTION_POOL_SIZE = 10
+    NOTION_KEEPALIVE_SECONDS = 60
+    NOTION_DNS_CACHE_SECONDS = 300
+    # Respuestas mayores se decodifican fuera del bucle de eventos
+    JSON_THREAD_THRESHOLD_BYTES = 256 * 1024
+    # Sin copia local, las consultas que devuelvan como mucho esta fracción se filtran en Notion
+    QUERY_PUSHDOWN_MAX_SELECTIVITY = 0.25
+    # Fallos seguidos que abren el circuito y espera entre pruebas de recuperación
+    CIRCUIT_FAILURE_THRESHOLD = 3
+    CIRCUIT_RESET_SECONDS = 30
     
     # Validación de configuraciones
     @classmethod
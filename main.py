@@ -2,30 +2,68 @@ import discord
 from discord.ext import commands, tasks
 from config import Config
 from utils.cache import cache_manager
+from utils.history import history_store
+from utils.persistence import snapshot_store
 from services.notion_client import notion_client
 
 # Validar configuración
 Config.validate()
 
+class BrainrotBot(commands.Bot):
+    async def setup_hook(self):
+        # Servir la copia local desde el primer comando; se reconcilia en segundo plano
+        loaded = await snapshot_store.load_async()
+        if loaded:
+            print(f"💾 Copia local cargada: {loaded} Brainrots")
+    
+    async def close(self):
+        # Detener antes los refrescos en segundo plano para no dejar peticiones a medias
+        refresh_cache.cancel()
+        clean_cache.cancel()
+        await notion_client.shutdown()
+        await snapshot_store.save_async()
+        print("👋 Bot desconectado")
+        await super().close()
+
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = BrainrotBot(command_prefix='!', intents=intents)
 
-# Tarea automática para limpiar caché
+# Tarea automática de mantenimiento; las relaciones caducadas se conservan hasta renovarse
 @tasks.loop(minutes=30)
 async def clean_cache():
-    cache_manager.clear_relation_cache()
-    print("🧹 Caché limpiada")
+    if history_store.compaction_due():
+        try:
+            deltas, totals = await history_store.compact_async()
+            print(f"🗜️ Histórico compactado ({deltas} cambios y {totals} totales antiguos)")
+        except Exception as e:
+            print(f"⚠️ Error compactando el histórico: {e}")
+
+# Refresco periódico para que los comandos nunca esperen a Notion
+@tasks.loop(minutes=Config.CACHE_DURATION_MINUTES)
+async def refresh_cache():
+    await notion_client.refresh_in_background(jitter=Config.REFRESH_JITTER_SECONDS)
+    await snapshot_store.save_async()
+    try:
+        await history_store.record_async(cache_manager.snapshot)
+    except Exception as e:
+        print(f"⚠️ Error guardando el histórico: {e}")
 
 @bot.event
 async def on_ready():
     print(f'{bot.user} se ha conectado a Discord! 🚀')
-    clean_cache.start()
+    if not clean_cache.is_running():
+        clean_cache.start()
+    if not refresh_cache.is_running():
+        refresh_cache.start()
     
     # Cargar comandos modularizados
     try:
         await bot.load_extension('commands.brainrots')
         await bot.load_extension('commands.dashboard')
+        await bot.load_extension('commands.leaderboard')
+        await bot.load_extension('commands.accounts')
+        await bot.load_extension('commands.history')
         await bot.load_extension('commands.utility')
         print("✅ Comandos cargados correctamente")
     except Exception as e:
@@ -36,11 +74,5 @@ async def on_ready():
     except Exception as e:
         print(f"⚠️ Error sincronizando comandos slash: {e}")
 
-@bot.event
-async def on_close():
-    await notion_client.close_session()
-    clean_cache.stop()
-    print("👋 Bot desconectado")
-
 if __name__ == "__main__":
-    bot.run(Config.DISCORD_TOKEN)
\ No newline at end of file
+    bot.run(Config.DISCORD_TOKEN)
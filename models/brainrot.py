@@ -1,57 +1,144 @@
-from typing import List, Dict, Any
+import sys
+from typing import List, Dict, Any, AsyncIterator, Optional, Iterable, Sequence, Tuple
 from services.notion_client import notion_client
+from services.schema import schema_registry
+from services.leaderboard import top_k
+from services.search import SearchIndex, SearchQuery
+from utils.cache import Snapshot, cache_manager
 
 class Brainrot:
-    def __init__(self, notion_data: Dict[str, Any]):
-        self.properties = notion_data.get('properties', {})
-        self.id = notion_data.get('id')
+    """Registro ya interpretado de una página de Notion; el JSON original no se conserva"""
     
-    async def get_name(self) -> str:
-        return await notion_client.extract_property(self.properties, 'Brainrot', 'title')
+    __slots__ = ('id', 'name', 'price', 'rarezas', 'efectos', 'vendido', 'cuenta_id', 'last_edited')
     
-    async def get_price(self) -> str:
-        return await notion_client.extract_property(self.properties, 'Dinero / Segundo', 'number')
+    def __init__(self, id: str, name: str, price: Optional[float], rarezas: Tuple[str, ...],
+                 efectos: Tuple[str, ...], vendido: bool, cuenta_id: Optional[str],
+                 last_edited: Optional[str]):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.rarezas = rarezas
+        self.efectos = efectos
+        self.vendido = vendido
+        self.cuenta_id = cuenta_id
+        self.last_edited = last_edited
     
-    async def get_rarezas(self) -> List[str]:
-        return await notion_client.extract_property(self.properties, 'Rareza', 'multi_select')
+    @classmethod
+    def from_notion(cls, notion_data: Dict[str, Any]) -> 'Brainrot':
+        # El extractor compilado devuelve los campos en el mismo orden que __slots__
+        return cls(notion_data.get('id'), *schema_registry.extractor(notion_data),
+                   notion_data.get('last_edited_time'))
     
-    async def get_efectos(self) -> List[str]:
-        return await notion_client.extract_property(self.properties, 'Efectos', 'multi_select')
+    def to_row(self) -> list:
+        return [self.id, self.name, self.price, list(self.rarezas), list(self.efectos),
+                self.vendido, self.cuenta_id, self.last_edited]
     
-    async def is_vendido(self) -> bool:
-        return await notion_client.extract_property(self.properties, 'Vendido?', 'checkbox')
+    @classmethod
+    def from_row(cls, row: list) -> 'Brainrot':
+        id, name, price, rarezas, efectos, vendido, cuenta_id, last_edited = row
+        return cls(id, name, price, tuple(map(sys.intern, rarezas)), tuple(map(sys.intern, efectos)),
+                   vendido, cuenta_id, last_edited)
     
-    async def get_cuenta(self) -> str:
-        return await notion_client.extract_property(self.properties, 'Cuenta', 'relation')
+    def get_cuenta(self) -> str:
+        return notion_client.relation_name(self.cuenta_id) if self.cuenta_id else 'N/A'
     
-    async def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self) -> Dict[str, Any]:
         return {
-            'nombre': await self.get_name(),
-            'precio': await self.get_price(),
-            'rarezas': await self.get_rarezas(),
-            'efectos': await self.get_efectos(),
-            'vendido': await self.is_vendido(),
-            'cuenta': await self.get_cuenta()
+            'nombre': self.name,
+            'precio': self.price,
+            'rarezas': list(self.rarezas),
+            'efectos': list(self.efectos),
+            'vendido': self.vendido,
+            'cuenta': self.get_cuenta()
         }
 
 class BrainrotCollection:
-    def __init__(self):
-        self.brainrots: List[Brainrot] = []
+    """Consultas sobre una copia concreta de la colección; no se recarga ni se modifica"""
     
-    async def load_from_notion(self, force_refresh: bool = False):
-        data = await notion_client.query_database(force_refresh)
-        if data and 'results' in data:
-            self.brainrots = [Brainrot(item) for item in data['results']]
+    def __init__(self, snapshot: Snapshot):
+        self.snapshot = snapshot
     
-    def get_all(self) -> List[Brainrot]:
-        return self.brainrots
+    @classmethod
+    async def load(cls, force_refresh: bool = False) -> 'BrainrotCollection':
+        return cls(await notion_client.get_snapshot(force_refresh))
+    
+    @classmethod
+    def cached(cls) -> Optional['BrainrotCollection']:
+        """Copia publicada sin consultar Notion, o None si aún no hay datos"""
+        snapshot = cache_manager.snapshot
+        return cls(snapshot) if snapshot else None
+    
+    @staticmethod
+    async def stream_from_notion(force_refresh: bool = False) -> AsyncIterator[Sequence[Brainrot]]:
+        """Entrega la colección lote a lote, resolviendo las cuentas de cada uno"""
+        async for batch in notion_client.stream_database(force_refresh):
+            await resolve_cuentas(batch)
+            yield batch
+        # La copia se publica mientras se resuelven las cuentas de los lotes: se completan sus nombres
+        snapshot = cache_manager.snapshot
+        if snapshot is not None:
+            await cuenta_names(snapshot.index)
+    
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
+    
+    def get_all(self) -> Sequence[Brainrot]:
+        return self.snapshot.records
+    
+    def get_index(self) -> SearchIndex:
+        return self.snapshot.index
+    
+    async def search(self, query: SearchQuery) -> List[Brainrot]:
+        return await search_index(self.get_index(), query)
+    
+    async def top(self, query: SearchQuery, k: int) -> List[Brainrot]:
+        """Clasificación por precio: más caros primero, o más baratos con orden:precio"""
+        cheapest = query.sort == 'price' and not query.descending
+        if query.text or query.efecto or query.min_price is not None or query.max_price is not None:
+            # Filtros sin partición propia: se busca y se seleccionan los k con un montículo
+            return top_k(await self.search(query), k, cheapest)
+        cuenta_ids = await match_cuentas(self.get_index(), query.cuenta) if query.cuenta else None
+        return self.snapshot.leaderboard.top(k, query.rareza, query.vendido, cuenta_ids, cheapest)
     
     def filter_by_name(self, query: str) -> List[Brainrot]:
-        return [br for br in self.brainrots if query.lower() in (br.get_name() or '').lower()]
+        return self.get_index().search(SearchQuery(text=query))
     
     def filter_by_rareza(self, rareza: str) -> List[Brainrot]:
-        return [br for br in self.brainrots if rareza.lower() in [r.lower() for r in (br.get_rarezas() or [])]]
+        return self.get_index().search(SearchQuery(rareza=rareza))
     
     def get_stats(self) -> Dict[str, Any]:
-        # Implementar estadísticas
-        return {}
\ No newline at end of file
+        """Resumen precalculado al construir la copia"""
+        return self.snapshot.stats.summary()
+    
+    def get_analytics(self) -> Dict[str, Any]:
+        """Histograma, percentiles, medias y tablas cruzadas calculados al construir la copia"""
+        return self.snapshot.analytics.report
+    
+    async def get_cuentas(self) -> Dict[str, Dict[str, Any]]:
+        """Agregados de cada cuenta con su nombre, ordenados por ingresos disponibles"""
+        names = await cuenta_names(self.get_index())
+        stats = self.snapshot.stats
+        cuentas = {cuenta_id: dict(stats.cuenta_summary(cuenta_id), id=cuenta_id, nombre=name)
+                   for cuenta_id, name in names.items()}
+        return dict(sorted(cuentas.items(), key=lambda item: item[1]['disponible_value'], reverse=True))
+
+async def search_index(index: SearchIndex, query: SearchQuery) -> List[Brainrot]:
+    """Aplica la consulta a un índice, resolviendo antes los nombres de cuenta si se filtra por ellos"""
+    cuenta_ids = await match_cuentas(index, query.cuenta) if query.cuenta else None
+    return index.search(query, cuenta_ids)
+
+async def cuenta_names(index: SearchIndex) -> Dict[str, str]:
+    """Nombres de todas las cuentas de la copia, resueltos en bloque"""
+    names = await notion_client.resolve_relations(index.cuentas)
+    index.set_cuenta_names(names)
+    return names
+
+async def match_cuentas(index: SearchIndex, text: str) -> List[str]:
+    """Ids de las cuentas de la copia cuyo nombre contiene el texto"""
+    names = await cuenta_names(index)
+    return [cuenta_id for cuenta_id, name in names.items() if text.lower() in name.lower()]
+
+async def resolve_cuentas(brainrots: Iterable[Brainrot]) -> Dict[str, str]:
+    """Precarga en bloque las cuentas relacionadas para no resolverlas una a una"""
+    return await notion_client.resolve_relations(br.cuenta_id for br in brainrots if br.cuenta_id)
@@ -0,0 +1,124 @@
+import math
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# NumPy es opcional: sin él se usan las mismas columnas con bucles de la biblioteca estándar
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BACKEND = 'numpy' if np is not None else 'array'
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+HISTOGRAM_BINS = 8
+KINDS = ('rareza', 'efecto')
+
+class Analytics:
+    """Columnas contiguas de una copia (precio, vendido, códigos de rareza y efecto) y su informe"""
+    
+    def __init__(self, brainrots: Iterable):
+        self.prices = array('d')  # NaN para los Brainrots sin precio
+        self.vendido = array('b')
+        # Un Brainrot puede tener varias etiquetas: pares (fila, código) por tipo
+        self.rows = {kind: array('q') for kind in KINDS}
+        self.codes = {kind: array('q') for kind in KINDS}
+        codes: Dict[str, Dict[str, int]] = {kind: {} for kind in KINDS}
+        
+        for position, brainrot in enumerate(brainrots):
+            self.prices.append(math.nan if brainrot.price is None else float(brainrot.price))
+            self.vendido.append(1 if brainrot.vendido else 0)
+            for kind, labels in (('rareza', brainrot.rarezas), ('efecto', brainrot.efectos)):
+                for label in labels:
+                    self.rows[kind].append(position)
+                    self.codes[kind].append(codes[kind].setdefault(label, len(codes[kind])))
+        
+        # El orden de inserción del diccionario coincide con el de los códigos
+        self.labels = {kind: list(codes[kind]) for kind in KINDS}
+        # La copia no cambia: el informe se calcula una sola vez
+        self.report = self.build_report()
+    
+    def build_report(self) -> Dict[str, Any]:
+        return {
+            'backend': BACKEND,
+            'histogram': self.price_histogram(),
+            'percentiles': self.percentiles(),
+            'rarezas': self.mean_by('rareza'),
+            'efectos': self.mean_by('efecto'),
+            'crosstab': self.crosstab('rareza'),
+        }
+    
+    def priced(self) -> List[float]:
+        return [price for price in self.prices if not math.isnan(price)]
+    
+    def percentiles(self, percents: Tuple[int, ...] = PERCENTILES) -> Dict[int, Optional[float]]:
+        if np is not None:
+            prices = np.frombuffer(self.prices, dtype=np.float64)
+            ordered = np.sort(prices[~np.isnan(prices)])
+        else:
+            ordered = sorted(self.priced())
+        if len(ordered) == 0:
+            return {p: None for p in percents}
+        # Mismo criterio que StatsEngine.percentile: el valor más cercano, sin interpolar
+        return {p: float(ordered[round(p / 100 * (len(ordered) - 1))]) for p in percents}
+    
+    def price_histogram(self, bins: int = HISTOGRAM_BINS) -> List[Tuple[float, float, int]]:
+        """Tramos de precio en escala logarítmica: los precios abarcan varios órdenes de magnitud"""
+        if np is not None:
+            prices = np.frombuffer(self.prices, dtype=np.float64)
+            positive = prices[prices > 0]  # NaN nunca es > 0
+            if positive.size == 0:
+                return []
+            logs = np.log10(positive)
+            low, high = float(logs.min()), float(logs.max())
+            if low == high:
+                return [(float(positive[0]), float(positive[0]), int(positive.size))]
+            counts, edges = np.histogram(logs, bins=bins, range=(low, high))
+            counts, edges = counts.tolist(), edges.tolist()
+        else:
+            logs = [math.log10(price) for price in self.priced() if price > 0]
+            if not logs:
+                return []
+            low, high = min(logs), max(logs)
+            if low == high:
+                price = 10 ** low
+                return [(price, price, len(logs))]
+            width = (high - low) / bins
+            counts = [0] * bins
+            for value in logs:
+                counts[min(int((value - low) / width), bins - 1)] += 1
+            edges = [low + width * i for i in range(bins + 1)]
+        return [(10 ** edges[i], 10 ** edges[i + 1], counts[i]) for i in range(bins)]
+    
+    def mean_by(self, kind: str) -> List[Tuple[str, float, int]]:
+        """(etiqueta, precio medio, Brainrots con precio), de mayor a menor media"""
+        labels = self.labels[kind]
+        if np is not None:
+            prices = np.frombuffer(self.prices, dtype=np.float64)[np.frombuffer(self.rows[kind], dtype=np.int64)]
+            codes = np.frombuffer(self.codes[kind], dtype=np.int64)
+            valid = ~np.isnan(prices)
+            sums = np.bincount(codes[valid], weights=prices[valid], minlength=len(labels)).tolist()
+            counts = np.bincount(codes[valid], minlength=len(labels)).tolist()
+        else:
+            sums, counts = [0.0] * len(labels), [0] * len(labels)
+            for row, code in zip(self.rows[kind], self.codes[kind]):
+                price = self.prices[row]
+                if not math.isnan(price):
+                    sums[code] += price
+                    counts[code] += 1
+        means = [(labels[code], sums[code] / counts[code], counts[code])
+                 for code in range(len(labels)) if counts[code]]
+        return sorted(means, key=lambda item: item[1], reverse=True)
+    
+    def crosstab(self, kind: str) -> List[Tuple[str, int, int]]:
+        """(etiqueta, disponibles, vendidos), de más a menos Brainrots"""
+        labels = self.labels[kind]
+        if np is not None:
+            vendido = np.frombuffer(self.vendido, dtype=np.int8)[np.frombuffer(self.rows[kind], dtype=np.int64)]
+            cells = np.frombuffer(self.codes[kind], dtype=np.int64) * 2 + vendido
+            table = np.bincount(cells, minlength=2 * len(labels)).tolist()
+        else:
+            table = [0] * (2 * len(labels))
+            for row, code in zip(self.rows[kind], self.codes[kind]):
+                table[code * 2 + self.vendido[row]] += 1
+        rows = [(labels[code], table[code * 2], table[code * 2 + 1]) for code in range(len(labels))]
+        return sorted(rows, key=lambda item: item[1] + item[2], reverse=True)
@@ -0,0 +1,58 @@
+import time
+from typing import Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """Deja de llamar a Notion tras varios fallos seguidos y deja pasar una prueba cada cierto tiempo"""
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+    
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+    
+    def allow_request(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.state == HALF_OPEN and not self.probing:
+            # Solo una petición de prueba a la vez
+            self.probing = True
+            return True
+        return False
+    
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+    
+    def release_probe(self):
+        """Libera la prueba en curso si terminó sin anotar éxito ni fallo"""
+        if self.state == HALF_OPEN:
+            self.probing = False
+    
+    def record_failure(self) -> bool:
+        """Anota un fallo; devuelve True si el circuito acaba de abrirse"""
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            was_closed = self.state == CLOSED
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.probing = False
+            return was_closed
+        return False
@@ -0,0 +1,111 @@
+import heapq
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+# (precio, id, brainrot): el id desempata y nunca se llega a comparar el registro
+Entry = Tuple[float, str, Any]
+PartitionKey = Tuple[str, Any]
+
+def top_k(brainrots: Iterable, k: int, cheapest: bool = False) -> List:
+    """Top-K con un montículo para filtros que no tienen partición propia"""
+    priced = (br for br in brainrots if br.price is not None)
+    select = heapq.nsmallest if cheapest else heapq.nlargest
+    return select(k, priced, key=lambda br: br.price)
+
+class PriceLeaderboard:
+    """Listas ordenadas por precio, una por rareza, estado de venta y cuenta, además de la global"""
+    
+    def __init__(self):
+        self.partitions: Dict[PartitionKey, List[Entry]] = {}
+    
+    @classmethod
+    def build(cls, brainrots: Iterable) -> 'PriceLeaderboard':
+        leaderboard = cls()
+        for brainrot in brainrots:
+            if brainrot.price is None:
+                continue
+            entry = (brainrot.price, brainrot.id, brainrot)
+            for key in cls.keys(brainrot):
+                leaderboard.partitions.setdefault(key, []).append(entry)
+        for entries in leaderboard.partitions.values():
+            entries.sort()
+        return leaderboard
+    
+    def copy(self) -> 'PriceLeaderboard':
+        leaderboard = PriceLeaderboard()
+        leaderboard.partitions = {key: list(entries) for key, entries in self.partitions.items()}
+        return leaderboard
+    
+    @staticmethod
+    def keys(brainrot) -> Iterator[PartitionKey]:
+        yield ('all', None)
+        yield ('vendido', bool(brainrot.vendido))
+        for rareza in brainrot.rarezas:
+            yield ('rareza', rareza.lower())
+        if brainrot.cuenta_id:
+            yield ('cuenta', brainrot.cuenta_id)
+    
+    def add(self, brainrot):
+        if brainrot.price is None:
+            return
+        entry = (brainrot.price, brainrot.id, brainrot)
+        for key in self.keys(brainrot):
+            insort(self.partitions.setdefault(key, []), entry)
+    
+    def remove(self, brainrot):
+        if brainrot.price is None:
+            return
+        for key in self.keys(brainrot):
+            entries = self.partitions.get(key)
+            if not entries:
+                continue
+            # (precio, id) queda justo antes de su entrada: no hace falta comparar registros
+            index = bisect_left(entries, (brainrot.price, brainrot.id))
+            if index < len(entries) and entries[index][1] == brainrot.id:
+                del entries[index]
+            if not entries:
+                del self.partitions[key]
+    
+    def update(self, old, new):
+        self.remove(old)
+        self.add(new)
+    
+    def rareza_keys(self, value: str) -> List[PartitionKey]:
+        # Mismo criterio que el índice de búsqueda: exacta sin mayúsculas o, si no, subcadena
+        value = value.lower()
+        if ('rareza', value) in self.partitions:
+            return [('rareza', value)]
+        return [key for key in self.partitions if key[0] == 'rareza' and value in key[1]]
+    
+    def top(self, k: int, rareza: Optional[str] = None, vendido: Optional[bool] = None,
+            cuenta_ids: Optional[Iterable[str]] = None, cheapest: bool = False) -> List:
+        """Los k más caros (o más baratos) que cumplen todos los filtros"""
+        filters: List[List[PartitionKey]] = []
+        if rareza:
+            filters.append(self.rareza_keys(rareza))
+        if vendido is not None:
+            filters.append([('vendido', vendido)])
+        if cuenta_ids is not None:
+            filters.append([('cuenta', cuenta_id) for cuenta_id in cuenta_ids])
+        if not filters:
+            filters.append([('all', None)])
+        
+        # Se recorre la dimensión con menos entradas y el resto se comprueba registro a registro
+        sizes = [sum(len(self.partitions.get(key, ())) for key in keys) for keys in filters]
+        driver = filters.pop(sizes.index(min(sizes)))
+        lists = [self.partitions[key] if cheapest else reversed(self.partitions[key])
+                 for key in driver if key in self.partitions]
+        ordered = heapq.merge(*lists, reverse=not cheapest)
+        
+        wanted = [set(keys) for keys in filters]
+        seen = set()
+        
+        def matches(entry: Entry) -> bool:
+            if entry[1] in seen:  # Un registro con varias rarezas aparece en varias listas
+                return False
+            seen.add(entry[1])
+            keys = set(self.keys(entry[2]))
+            return all(keys & allowed for allowed in wanted)
+        
+        return [entry[2] for entry in islice(filter(matches, ordered), k)]
@@ -1,7 +1,41 @@
+import asyncio
+import random
 import aiohttp
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, AsyncIterator, Iterable, Sequence, TYPE_CHECKING
 from config import Config
-from utils.cache import cache_manager
+from utils.cache import Snapshot, cache_manager
+from utils.singleflight import request_coalescer
+from services.rate_limiter import RateLimiter, request_priority, BACKGROUND, INTERACTIVE
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError, HALF_OPEN
+from services.transport import PooledTransport, request_timeout
+from utils import json_codec
+
+if TYPE_CHECKING:
+    from models.brainrot import Brainrot
+
+# Clave del registro de peticiones en curso para la base de datos principal
+DATABASE_KEY = 'database'
+ACCOUNTS_KEY = 'accounts'
+PAGE_KEY = 'page'  # Contador común para todas las páginas sueltas
+
+# Límite de ritmo compartido por todas las peticiones a Notion
+rate_limiter = RateLimiter(Config.NOTION_RATE_LIMIT_PER_SECOND, Config.NOTION_RATE_LIMIT_BURST)
+
+circuit_breaker = CircuitBreaker(Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_SECONDS)
+
+class NotionAPIError(Exception):
+    pass
+
+def extract_title(page: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Devuelve el texto de la propiedad de tipo título de una página"""
+    if not page:
+        return None
+    for prop_value in page.get('properties', {}).values():
+        if prop_value.get('type') == 'title' and prop_value.get('title'):
+            name = prop_value['title'][0].get('text', {}).get('content')
+            if name:
+                return name
+    return None
 
 class NotionClient:
     def __init__(self):
@@ -11,92 +45,314 @@ class NotionClient:
             "Content-Type": "application/json",
             "Notion-Version": "2022-06-28"
         }
-        self.session: Optional[aiohttp.ClientSession] = None
+        self.transport = PooledTransport(self.headers)
+        self.semaphore = asyncio.Semaphore(Config.NOTION_MAX_CONCURRENCY)
+        self.closing = asyncio.Event()
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.probe_task: Optional[asyncio.Task] = None
     
-    async def create_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession(headers=self.headers)
+    async def create_session(self) -> aiohttp.ClientSession:
+        return await self.transport.get_session()
     
     async def close_session(self):
-        if self.session:
-            await self.session.close()
-            self.session = None
+        await self.transport.close()
+    
+    async def request(self, method: str, url: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Petición a Notion con límite de ritmo y reintentos ante 429, 5xx y errores de red"""
+        if not circuit_breaker.allow_request():
+            raise CircuitOpenError("Notion no está disponible")
+        # Con el circuito medio abierto esta es la petición de prueba
+        probe = circuit_breaker.state == HALF_OPEN
+        try:
+            return await self._request(method, url, payload)
+        finally:
+            # Si se cancela o falla sin anotar el resultado, la prueba no puede quedar ocupada
+            if probe:
+                circuit_breaker.release_probe()
+    
+    async def _request(self, method: str, url: str, payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        session = await self.create_session()
+        
+        # Los comandos de usuario tienen un plazo total; la sincronización puede esperar más
+        loop = asyncio.get_running_loop()
+        deadline = None
+        if request_priority.get() == INTERACTIVE:
+            deadline = loop.time() + Config.NOTION_INTERACTIVE_DEADLINE_SECONDS
+        
+        for attempt in range(Config.NOTION_MAX_RETRIES + 1):
+            retry_after = None
+            if deadline is None:
+                await rate_limiter.acquire()
+            else:
+                # Una pausa por Retry-After puede ser larga: el usuario no espera más que su plazo
+                try:
+                    await asyncio.wait_for(rate_limiter.acquire(), max(0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    # Es espera local, no un fallo de Notion: no cuenta para el circuito
+                    raise NotionAPIError("Plazo agotado esperando turno para Notion")
+            timeout = Config.NOTION_REQUEST_TIMEOUT_SECONDS
+            if deadline is not None:
+                timeout = max(0.1, min(timeout, deadline - loop.time()))
+            try:
+                async with self.semaphore:
+                    async with session.request(method, url, json=payload,
+                                               timeout=request_timeout(timeout)) as response:
+                        if response.status == 429 or response.status >= 500:
+                            retry_after = response.headers.get('Retry-After')
+                            error = f"HTTP {response.status}"
+                        else:
+                            data = await json_codec.decode(await response.read())
+                            circuit_breaker.record_success()
+                            if data.get('object') == 'error':
+                                rate_limiter.metrics['errors'] += 1
+                                raise NotionAPIError(data.get('message', f"HTTP {response.status}"))
+                            return data
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                error = str(e) or e.__class__.__name__
+            
+            if attempt == Config.NOTION_MAX_RETRIES:
+                break
+            
+            # Respetar Retry-After; si no viene, espera exponencial con jitter
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = min(Config.NOTION_BACKOFF_MAX_SECONDS,
+                            Config.NOTION_BACKOFF_BASE_SECONDS * 2 ** attempt) * random.uniform(0.5, 1.5)
+            if retry_after is not None:
+                rate_limiter.pause(delay)
+            if deadline is not None and loop.time() + delay >= deadline:
+                break
+            rate_limiter.metrics['retries'] += 1
+            await asyncio.sleep(delay)
+        
+        rate_limiter.metrics['errors'] += 1
+        if circuit_breaker.record_failure():
+            print("⚠️ Notion no responde: sirviendo la última copia hasta que se recupere")
+            self.start_recovery_probe()
+        raise NotionAPIError(f"{error} tras {attempt + 1} intentos")
+    
+    def start_recovery_probe(self):
+        if self.closing.is_set() or (self.probe_task and not self.probe_task.done()):
+            return
+        self.probe_task = asyncio.ensure_future(self._probe_recovery())
+    
+    async def _probe_recovery(self):
+        """Comprueba en segundo plano si Notion ha vuelto y entonces refresca la caché"""
+        request_priority.set(BACKGROUND)
+        while not self.closing.is_set():
+            try:
+                await asyncio.wait_for(self.closing.wait(), timeout=Config.CIRCUIT_RESET_SECONDS)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.get_database()
+            except Exception:
+                continue
+            if not circuit_breaker.is_open:
+                print("✅ Notion vuelve a responder")
+                self.schedule_refresh()
+                return
+    
+    async def iter_database(self, database_id: Optional[str] = None,
+                            body: Optional[Dict[str, Any]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Recorre todas las páginas del cursor y entrega los resultados de cada una"""
+        url = f"https://api.notion.com/v1/databases/{database_id or Config.NOTION_DATABASE_ID}/query"
+        payload = dict(body or {})
+        payload['page_size'] = Config.NOTION_PAGE_SIZE
+        
+        while True:
+            try:
+                data = await self.request('POST', url, payload)
+            except Exception as e:
+                raise Exception(f"Error querying Notion database: {e}")
+            
+            yield data.get('results', [])
+            
+            if not data.get('has_more') or not data.get('next_cursor'):
+                break
+            payload['start_cursor'] = data['next_cursor']
+    
+    async def get_database(self, database_id: Optional[str] = None) -> Dict[str, Any]:
+        """Objeto de la base de datos, incluido su esquema de propiedades"""
+        url = f"https://api.notion.com/v1/databases/{database_id or Config.NOTION_DATABASE_ID}"
+        
+        try:
+            return await self.request('GET', url)
+        except Exception as e:
+            raise Exception(f"Error getting Notion database: {e}")
+    
+    async def stream_database(self, force_refresh: bool = False) -> AsyncIterator[Sequence['Brainrot']]:
+        """Igual que get_snapshot pero entrega cada lote en cuanto llega"""
+        cached = self._serve_from_cache(force_refresh)
+        if cached is not None:
+            yield cached.records
+            return
+        
+        # Otra petición ya está descargando la base de datos: esperar su resultado
+        if request_coalescer.is_in_flight(DATABASE_KEY):
+            snapshot = await request_coalescer.do(DATABASE_KEY, self.fetch_database)
+            yield snapshot.records
+            return
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        fetch = asyncio.ensure_future(
+            request_coalescer.do(DATABASE_KEY, lambda: self.fetch_database(queue))
+        )
+        yielded = False
+        try:
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    break
+                yielded = True
+                yield batch
+            await fetch
+        except Exception as e:
+            # Modo degradado: si Notion falla se sirve la última copia, aunque sea antigua
+            if yielded or not cache_manager.has_brainrot_data():
+                raise
+            print(f"⚠️ Sirviendo la copia en caché: {e}")
+            yield cache_manager.snapshot.records
     
-    async def query_database(self, force_refresh: bool = False) -> Dict[str, Any]:
-        if not force_refresh and cache_manager.is_brainrot_cache_valid():
-            return cache_manager.brainrot_cache['data']
+    async def fetch_database(self, queue: Optional[asyncio.Queue] = None) -> Snapshot:
+        from services.pipeline import parse_batch, build_snapshot
         
-        await self.create_session()
-        url = f"https://api.notion.com/v1/databases/{Config.NOTION_DATABASE_ID}/query"
+        brainrots: List['Brainrot'] = []
+        try:
+            async for batch in self.iter_database():
+                # Cada página se interpreta una sola vez, fuera del bucle, y el JSON se descarta
+                parsed = await parse_batch(batch)
+                brainrots.extend(parsed)
+                if queue is not None:
+                    queue.put_nowait(parsed)
+        finally:
+            if queue is not None:
+                queue.put_nowait(None)
+        
+        # Solo se publica el conjunto completo, ya con agregados e índice
+        return await build_snapshot(brainrots)
+    
+    def _serve_from_cache(self, force_refresh: bool) -> Optional[Snapshot]:
+        if force_refresh:
+            return None
+        if cache_manager.is_brainrot_cache_valid():
+            request_coalescer.record_hit(DATABASE_KEY)
+            return cache_manager.snapshot
+        if cache_manager.can_serve_stale():
+            # Copia caducada: se sirve ya y se refresca sin bloquear al usuario
+            request_coalescer.record_hit(DATABASE_KEY)
+            self.schedule_refresh()
+            return cache_manager.snapshot
+        return None
+    
+    def schedule_refresh(self):
+        if (self.closing.is_set() or circuit_breaker.is_open or
+                request_coalescer.is_in_flight(DATABASE_KEY)):
+            return
+        if self.refresh_task and not self.refresh_task.done():
+            return
+        self.refresh_task = asyncio.ensure_future(self.refresh_in_background())
+    
+    async def refresh_in_background(self, jitter: float = 0):
+        """Refresca la base de datos y las cuentas sin que ningún comando lo espere"""
+        if jitter:
+            try:
+                # Si el bot se cierra durante la espera no se llega a refrescar
+                await asyncio.wait_for(self.closing.wait(), timeout=random.uniform(0, jitter))
+                return
+            except asyncio.TimeoutError:
+                pass
+        if self.closing.is_set():
+            return
+        
+        from services.sync import sync_engine
+        # Los comandos de los usuarios pasan por delante de la sincronización
+        request_priority.set(BACKGROUND)
         
         try:
-            async with self.session.post(url) as response:
-                data = await response.json()
-                cache_manager.update_brainrot_cache(data)
-                return data
+            snapshot = await request_coalescer.do(DATABASE_KEY, sync_engine.sync)
+            if self.closing.is_set():
+                return
+            names = await self.resolve_relations(snapshot.index.cuentas, refresh=True)
+            # La copia se publicó con los nombres que hubiera en caché; ahora ya están todos
+            snapshot.index.set_cuenta_names(names)
         except Exception as e:
-            raise Exception(f"Error querying Notion database: {e}")
+            print(f"⚠️ Error refrescando la caché: {e}")
     
-    async def get_page(self, page_id: str) -> Dict[str, Any]:
-        cached_data = cache_manager.get_relation(page_id)
+    async def shutdown(self):
+        self.closing.set()
+        for task in (self.refresh_task, self.probe_task):
+            if task and not task.done():
+                task.cancel()
+        await self.close_session()
+    
+    async def get_snapshot(self, force_refresh: bool = False) -> Snapshot:
+        """Copia actual de la colección; quien la recibe la usa entera aunque se publique otra"""
+        cached = self._serve_from_cache(force_refresh)
+        if cached is not None:
+            return cached
+        
+        try:
+            return await request_coalescer.do(DATABASE_KEY, self.fetch_database)
+        except Exception as e:
+            if not cache_manager.has_brainrot_data():
+                raise
+            print(f"⚠️ Sirviendo la copia en caché: {e}")
+            return cache_manager.snapshot
+    
+    async def get_page(self, page_id: str, refresh: bool = False) -> Dict[str, Any]:
+        # Una relación caducada se vuelve a pedir; si falla, sigue disponible la anterior
+        cached_data = None if refresh or cache_manager.relation_expiring(page_id) else cache_manager.get_relation(page_id)
         if cached_data:
+            request_coalescer.record_hit(page_id, PAGE_KEY)
             return cached_data
         
-        await self.create_session()
+        return await request_coalescer.do(page_id, lambda: self._fetch_page(page_id), PAGE_KEY)
+    
+    async def _fetch_page(self, page_id: str) -> Dict[str, Any]:
         url = f"https://api.notion.com/v1/pages/{page_id}"
         
         try:
-            async with self.session.get(url) as response:
-                data = await response.json()
-                cache_manager.set_relation(page_id, data)
-                return data
+            data = await self.request('GET', url)
         except Exception as e:
             raise Exception(f"Error getting Notion page {page_id}: {e}")
+        cache_manager.set_relation(page_id, data)
+        return data
     
-    async def extract_property(self, properties: Dict[str, Any], 
-                             property_name: str, 
-                             property_type: str) -> Any:
-        from utils.formatters import format_price
+    async def resolve_relations(self, relation_ids: Iterable[str], refresh: bool = False) -> Dict[str, str]:
+        """Resuelve en bloque los nombres de varias relaciones"""
+        unique_ids = list(dict.fromkeys(relation_ids))
+        # El refresco periódico renueva también las que caducarían antes del siguiente
+        margin = Config.CACHE_DURATION_MINUTES if refresh else 0
+        missing = [rid for rid in unique_ids if cache_manager.relation_expiring(rid, margin)]
         
-        try:
-            prop = properties.get(property_name, {})
-            
-            if property_type == 'title':
-                if prop.get('title') and prop['title']:
-                    return prop['title'][0].get('text', {}).get('content', 'N/A')
-            
-            elif property_type == 'number':
-                number_value = prop.get('number')
-                if number_value is not None:
-                    return format_price(number_value)
-            
-            elif property_type == 'multi_select':
-                if prop.get('multi_select'):
-                    return [item['name'] for item in prop['multi_select']]
-            
-            elif property_type == 'checkbox':
-                return prop.get('checkbox', False)
-            
-            elif property_type == 'relation':
-                if prop.get('relation') and prop['relation']:
-                    relation_id = prop['relation'][0]['id']
-                    try:
-                        related_page = await self.get_page(relation_id)
-                        for prop_value in related_page.get('properties', {}).values():
-                            if (prop_value.get('type') == 'title' and 
-                                prop_value.get('title') and 
-                                prop_value['title']):
-                                name = prop_value['title'][0].get('text', {}).get('content')
-                                if name:
-                                    return name
-                        return f"Cuenta #{relation_id[:8]}"
-                    except:
-                        return f"Cuenta #{relation_id[:8]}"
+        # Con la base de cuentas configurada basta una consulta paginada
+        if missing and Config.NOTION_ACCOUNTS_DATABASE_ID:
+            try:
+                await request_coalescer.do(ACCOUNTS_KEY, self._load_accounts_database)
+            except Exception as e:
+                print(f"Error cargando la base de cuentas: {e}")
+            missing = [rid for rid in missing if cache_manager.relation_expiring(rid, margin)]
         
-        except Exception as e:
-            print(f"Error extrayendo propiedad {property_name}: {e}")
+        # El semáforo de request limita las peticiones simultáneas
+        if missing:
+            await asyncio.gather(*(self.get_page(rid, refresh) for rid in missing), return_exceptions=True)
         
-        return 'N/A'
+        return {rid: self.relation_name(rid) for rid in unique_ids}
+    
+    async def _load_accounts_database(self) -> int:
+        count = 0
+        async for batch in self.iter_database(Config.NOTION_ACCOUNTS_DATABASE_ID):
+            for page in batch:
+                cache_manager.set_relation(page['id'], page)
+            count += len(batch)
+        return count
+    
+    def relation_name(self, relation_id: str) -> str:
+        """Nombre de una relación ya cacheada, o un identificador corto si no lo está"""
+        return extract_title(cache_manager.get_relation(relation_id)) or f"Cuenta #{relation_id[:8]}"
 
 # Instancia global del cliente
 notion_client = NotionClient()
\ No newline at end of file
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from models.brainrot import Brainrot
+from services.notion_client import notion_client
+from services.analytics import Analytics
+from services.leaderboard import PriceLeaderboard
+from services.search import SearchIndex
+from services.stats import StatsEngine
+from utils.cache import Snapshot, cache_manager
+
+# Todo el trabajo de CPU de una copia se hace en un hilo para que el bucle de eventos
+# siga atendiendo interacciones y heartbeats del gateway mientras se construye
+
+Derived = Tuple[StatsEngine, SearchIndex, PriceLeaderboard, Analytics]
+
+def parse_pages(pages: List[Dict[str, Any]]) -> List[Brainrot]:
+    return [Brainrot.from_notion(page) for page in pages]
+
+def build_derived(brainrots: Sequence[Brainrot], stats: Optional[StatsEngine] = None,
+                  leaderboard: Optional[PriceLeaderboard] = None) -> Derived:
+    """Agregados e índices de una copia completa; reutiliza los que ya vengan actualizados"""
+    if stats is None:
+        stats = StatsEngine.build(brainrots)
+    if leaderboard is None:
+        leaderboard = PriceLeaderboard.build(brainrots)
+    # Las columnas de análisis se recalculan enteras: son pasadas vectorizadas sobre arrays
+    return stats, SearchIndex(brainrots), leaderboard, Analytics(brainrots)
+
+async def parse_batch(pages: List[Dict[str, Any]]) -> List[Brainrot]:
+    return await asyncio.to_thread(parse_pages, pages)
+
+async def build_snapshot(brainrots: Sequence[Brainrot], stats: Optional[StatsEngine] = None,
+                         leaderboard: Optional[PriceLeaderboard] = None, full: bool = True, last_update: Optional[datetime] = None,
+                         last_full_sync: Optional[datetime] = None) -> Snapshot:
+    """Construye aparte la copia nueva y la publica de una vez"""
+    records = tuple(brainrots)
+    stats, index, leaderboard, analytics = await asyncio.to_thread(build_derived, records, stats, leaderboard)
+    # Los nombres de cuenta salen de la caché de relaciones, que vive en el bucle
+    index.set_cuenta_names({cuenta_id: notion_client.relation_name(cuenta_id)
+                            for cuenta_id in index.cuentas})
+    return cache_manager.publish_snapshot(records, stats, index, leaderboard, analytics, full=full,
+                                          last_update=last_update, last_full_sync=last_full_sync)
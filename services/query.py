@@ -0,0 +1,174 @@
+import asyncio
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Tuple
+from config import Config
+from models.brainrot import Brainrot, BrainrotCollection, search_index
+from services.notion_client import NotionClient, notion_client, circuit_breaker, DATABASE_KEY
+from services.pipeline import parse_batch
+from services.schema import PageExtractor, schema_registry
+from services.search import SearchIndex, SearchQuery, tokenize
+from services.stats import StatsEngine
+from services.sync import SCHEMA_KEY, sync_engine
+from utils.cache import Snapshot, cache_manager
+from utils.singleflight import request_coalescer
+
+LOCAL = 'local'
+NOTION = 'notion'
+
+# Fracción supuesta de filas que deja pasar cada filtro cuando no hay estadísticas
+DEFAULT_SELECTIVITY = {'text': 0.1, 'rareza': 0.2, 'efecto': 0.2, 'vendido': 0.5, 'precio': 0.3}
+
+def _matching_options(options: List[str], value: str) -> List[str]:
+    # Mismo criterio que SearchIndex.match_label: exacta sin mayúsculas o, si no, subcadena
+    value = value.lower()
+    exact = [option for option in options if option.lower() == value]
+    return exact or [option for option in options if value in option.lower()]
+
+def _typed(prop_type: str, value_type: str, condition: Dict[str, Any]) -> Dict[str, Any]:
+    # Las fórmulas y rollups filtran por el tipo del resultado
+    if prop_type in ('formula', 'rollup'):
+        return {prop_type: {value_type: condition}}
+    return {prop_type: condition}
+
+def compile_filter(query: SearchQuery, extractor: PageExtractor) -> List[Tuple[str, Dict[str, Any]]]:
+    """Condiciones de Notion que equivalen a la consulta o la contienen; lo demás se filtra en local"""
+    conditions: List[Tuple[str, Dict[str, Any]]] = []
+    properties = extractor.properties
+    
+    if 'name' in properties:
+        name, _ = properties['name']
+        for token in tokenize(query.text):
+            conditions.append(('text', {'property': name, 'title': {'contains': token}}))
+    
+    for field, value in (('rarezas', query.rareza), ('efectos', query.efecto)):
+        if not value or field not in properties:
+            continue
+        # Sin la lista de opciones no se puede reproducir la coincidencia parcial
+        options = _matching_options(extractor.options.get(field, []), value)
+        if not options:
+            continue
+        name, prop_type = properties[field]
+        any_of = [{'property': name, prop_type: {'equals' if prop_type == 'select' else 'contains': option}}
+                  for option in options]
+        kind = 'rareza' if field == 'rarezas' else 'efecto'
+        conditions.append((kind, any_of[0] if len(any_of) == 1 else {'or': any_of}))
+    
+    if query.vendido is not None and 'vendido' in properties:
+        name, prop_type = properties['vendido']
+        conditions.append(('vendido', {'property': name,
+                                       **_typed(prop_type, 'checkbox', {'equals': query.vendido})}))
+    
+    if 'price' in properties:
+        name, prop_type = properties['price']
+        for bound, operator in ((query.min_price, 'greater_than_or_equal_to'),
+                                (query.max_price, 'less_than_or_equal_to')):
+            if bound is not None:
+                conditions.append(('precio', {'property': name,
+                                              **_typed(prop_type, 'number', {operator: bound})}))
+    return conditions
+
+def compile_sorts(query: SearchQuery, extractor: PageExtractor) -> List[Dict[str, Any]]:
+    field = query.sort if query.sort in extractor.properties else None
+    if field is None:
+        return []
+    name, _ = extractor.properties[field]
+    return [{'property': name, 'direction': 'descending' if query.descending else 'ascending'}]
+
+def compile_query(query: SearchQuery, extractor: PageExtractor) -> Dict[str, Any]:
+    """Cuerpo de la consulta a Notion con 'filter' y 'sorts'"""
+    body: Dict[str, Any] = {}
+    conditions = [condition for _, condition in compile_filter(query, extractor)]
+    if conditions:
+        body['filter'] = conditions[0] if len(conditions) == 1 else {'and': conditions}
+    sorts = compile_sorts(query, extractor)
+    if sorts:
+        body['sorts'] = sorts
+    return body
+
+def estimate_selectivity(kinds: List[str], query: SearchQuery, stats: Optional[StatsEngine]) -> float:
+    """Fracción esperada de filas que devolverá Notion con los filtros enviados"""
+    total = stats.total if stats else 0
+    selectivity = 1.0
+    for kind in kinds:
+        if not total:
+            selectivity *= DEFAULT_SELECTIVITY[kind]
+        elif kind in ('rareza', 'efecto'):
+            counts = stats.rareza_count if kind == 'rareza' else stats.efectos_count
+            value = (query.rareza if kind == 'rareza' else query.efecto).lower()
+            selectivity *= sum(count for label, count in counts.items() if value in label.lower()) / total
+        elif kind == 'vendido':
+            vendidos = stats.vendidos / total
+            selectivity *= vendidos if query.vendido else 1 - vendidos
+        elif kind == 'precio':
+            start = 0 if query.min_price is None else bisect_left(stats.prices, query.min_price)
+            end = len(stats.prices) if query.max_price is None else bisect_right(stats.prices, query.max_price)
+            selectivity *= max(0, end - start) / total
+        else:
+            selectivity *= DEFAULT_SELECTIVITY[kind]
+    return selectivity
+
+class QueryPlanner:
+    """Decide por consulta si se responde con la copia local o se envía filtrada a Notion"""
+    
+    def __init__(self, client: NotionClient):
+        self.client = client
+        self.stats: Dict[str, int] = {LOCAL: 0, NOTION: 0}
+    
+    async def plan(self, query: SearchQuery) -> Tuple[str, Optional[Dict[str, Any]]]:
+        # Con una copia servible la consulta local no cuesta ninguna petición
+        if cache_manager.is_brainrot_cache_valid() or cache_manager.can_serve_stale():
+            return LOCAL, None
+        # Con Notion caído o una descarga completa en curso no merece la pena otra consulta
+        if circuit_breaker.is_open or request_coalescer.is_in_flight(DATABASE_KEY):
+            return LOCAL, None
+        
+        # Las opciones de rareza y efecto salen del esquema real; sin él no se pueden enviar esos filtros
+        if schema_registry.stale:
+            try:
+                await request_coalescer.do(SCHEMA_KEY, sync_engine.load_schema)
+            except Exception as e:
+                print(f"⚠️ No se pudo leer el esquema de Notion: {e}")
+                return LOCAL, None
+        
+        extractor = schema_registry.extractor
+        conditions = compile_filter(query, extractor)
+        if not conditions:
+            return LOCAL, None
+        
+        # Solo hay estadísticas si la copia caducó con CACHE_STALE_WHILE_REVALIDATE desactivado;
+        # en el resto de casos se usan las selectividades por defecto
+        snapshot = cache_manager.snapshot
+        # Cada tipo de filtro cuenta una vez: mínimo y máximo de precio son un solo rango
+        kinds = list(dict.fromkeys(kind for kind, _ in conditions))
+        selectivity = estimate_selectivity(kinds, query, snapshot.stats if snapshot else None)
+        if selectivity > Config.QUERY_PUSHDOWN_MAX_SELECTIVITY:
+            return LOCAL, None
+        return NOTION, compile_query(query, extractor)
+    
+    async def execute(self, query: SearchQuery) -> Tuple[List[Brainrot], Optional[Snapshot]]:
+        """Resultados y copia local de la que salen; None si vienen directos de Notion"""
+        plan, body = await self.plan(query)
+        if plan == NOTION:
+            try:
+                results = await self.pushdown(query, body)
+                # La búsqueda local tolera erratas en el nombre; Notion no
+                if results or not query.text:
+                    self.stats[NOTION] += 1
+                    return results, None
+            except Exception as e:
+                print(f"⚠️ Consulta filtrada a Notion fallida, se usa la copia completa: {e}")
+        
+        self.stats[LOCAL] += 1
+        collection = await BrainrotCollection.load()
+        return await collection.search(query), collection.snapshot
+    
+    async def pushdown(self, query: SearchQuery, body: Dict[str, Any]) -> List[Brainrot]:
+        brainrots: List[Brainrot] = []
+        async for batch in self.client.iter_database(body=body):
+            brainrots.extend(await parse_batch(batch))
+        # Se aplica la consulta completa sobre el subconjunto: cuentas, orden y coincidencias parciales
+        index = await asyncio.to_thread(SearchIndex, brainrots)
+        return await search_index(index, query)
+
+# Planificador global de consultas
+query_planner = QueryPlanner(notion_client)
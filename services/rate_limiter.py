@@ -0,0 +1,85 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Prioridades: menor número, antes se atiende
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Prioridad de las peticiones hechas desde la tarea actual (las tareas hijas la heredan)
+request_priority: ContextVar[int] = ContextVar('request_priority', default=INTERACTIVE)
+
+class RateLimiter:
+    """Token bucket compartido por todas las peticiones a Notion, con colas por prioridad"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self.counter = itertools.count()
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, float] = {
+            'requests': 0,
+            'wait_seconds': 0.0,
+            'rate_limited': 0,
+            'retries': 0,
+            'errors': 0,
+        }
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def _delay(self) -> float:
+        now = time.monotonic()
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        return 0.0
+    
+    async def acquire(self, priority: Optional[int] = None):
+        if priority is None:
+            priority = request_priority.get()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.counter), future))
+        if self.dispatcher is None or self.dispatcher.done():
+            self.dispatcher = asyncio.ensure_future(self._dispatch())
+        
+        started = time.monotonic()
+        await future
+        self.metrics['requests'] += 1
+        self.metrics['wait_seconds'] += time.monotonic() - started
+    
+    async def _dispatch(self):
+        while self.waiters:
+            future = self.waiters[0][2]
+            if future.done():
+                # El que esperaba se canceló
+                heapq.heappop(self.waiters)
+                continue
+            delay = self._delay()
+            if delay > 0:
+                # Al despertar se vuelve a mirar la cabeza: puede haber llegado algo más prioritario
+                await asyncio.sleep(delay)
+                continue
+            heapq.heappop(self.waiters)
+            self.tokens -= 1
+            future.set_result(None)
+    
+    def pause(self, seconds: float):
+        """Detiene el envío de peticiones tras un 429 con Retry-After"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.metrics['rate_limited'] += 1
+    
+    def get_stats(self) -> Dict[str, float]:
+        stats = dict(self.metrics)
+        stats['queued'] = len(self.waiters)
+        return stats
@@ -0,0 +1,141 @@
+import sys
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# Campo del registro -> (propiedad de Notion esperada, tipos aceptados, valor por defecto)
+FIELD_PROPERTIES: List[Tuple[str, Optional[str], Tuple[str, ...], Any]] = [
+    ('name', None, ('title',), 'N/A'),  # La propiedad de título se localiza por su tipo
+    ('price', 'Dinero / Segundo', ('number', 'formula', 'rollup'), None),
+    ('rarezas', 'Rareza', ('multi_select', 'select'), ()),
+    ('efectos', 'Efectos', ('multi_select', 'select'), ()),
+    ('vendido', 'Vendido?', ('checkbox', 'formula'), False),
+    ('cuenta_id', 'Cuenta', ('relation',), None),
+]
+
+# Fórmulas y rollups pueden devolver cualquier tipo: si el resultado no es del tipo del campo
+# se usa el valor por defecto (bool es subclase de int, así que no vale como precio)
+RESULT_TYPES: Dict[str, Tuple[type, ...]] = {
+    'price': (int, float),
+    'vendido': (bool,),
+}
+
+# Esquema supuesto hasta que se lea el de la base de datos
+DEFAULT_SCHEMA: Dict[str, Dict[str, Any]] = {
+    'Brainrot': {'type': 'title'},
+    'Dinero / Segundo': {'type': 'number'},
+    'Rareza': {'type': 'multi_select'},
+    'Efectos': {'type': 'multi_select'},
+    'Vendido?': {'type': 'checkbox'},
+    'Cuenta': {'type': 'relation'},
+}
+
+def _title(prop):
+    items = prop['title']
+    return items[0].get('text', {}).get('content', 'N/A') if items else 'N/A'
+
+def _number(prop):
+    return prop['number']
+
+def _formula(prop):
+    formula = prop['formula']
+    return formula.get(formula.get('type'))
+
+def _rollup_number(prop):
+    return prop['rollup'].get('number')
+
+# Las etiquetas se repiten en miles de filas: se comparte una sola copia de cada una
+def _multi_select(prop):
+    return tuple(sys.intern(item['name']) for item in prop['multi_select'])
+
+def _select(prop):
+    return (sys.intern(prop['select']['name']),) if prop['select'] else ()
+
+def _checkbox(prop):
+    return prop['checkbox']
+
+def _relation(prop):
+    items = prop['relation']
+    return items[0]['id'] if items else None
+
+GETTERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'title': _title,
+    'number': _number,
+    'formula': _formula,
+    'rollup': _rollup_number,
+    'multi_select': _multi_select,
+    'select': _select,
+    'checkbox': _checkbox,
+    'relation': _relation,
+}
+
+class PageExtractor:
+    """Extractor fijo para un esquema: convierte una página en valores en una sola pasada"""
+    
+    def __init__(self, properties: Dict[str, Dict[str, Any]]):
+        self.fields: List[Tuple[str, Callable, Any, Optional[Tuple[type, ...]]]] = []
+        self.missing: List[str] = []
+        # Campo -> (propiedad, tipo) y opciones conocidas, para compilar filtros de Notion
+        self.properties: Dict[str, Tuple[str, str]] = {}
+        self.options: Dict[str, List[str]] = {}
+        
+        title_name = next((name for name, prop in properties.items() if prop.get('type') == 'title'), None)
+        for field, property_name, types, default in FIELD_PROPERTIES:
+            property_name = property_name or title_name
+            prop_type = properties.get(property_name, {}).get('type') if property_name else None
+            if prop_type not in types:
+                # Propiedad ausente o de otro tipo: el campo queda con su valor por defecto
+                self.missing.append(field)
+                self.fields.append((None, None, default, None))
+            else:
+                self.fields.append((property_name, GETTERS[prop_type], default, RESULT_TYPES.get(field)))
+                self.properties[field] = (property_name, prop_type)
+                options = properties[property_name].get(prop_type, {}).get('options')
+                if options:
+                    self.options[field] = [option['name'] for option in options]
+        
+        # Solo importan las propiedades usadas; añadir otras columnas no obliga a recompilar
+        self.signature = tuple((name, getter) for name, getter, _, _ in self.fields)
+    
+    def __call__(self, page: Dict[str, Any]) -> List[Any]:
+        """Devuelve los valores en el orden de FIELD_PROPERTIES; None si la página no encaja"""
+        properties = page.get('properties', {})
+        values = []
+        for property_name, getter, default, result_types in self.fields:
+            prop = properties.get(property_name)
+            if prop is None:
+                # Una propiedad compilada que falta suele ser un renombrado: se relee el esquema
+                if property_name is not None:
+                    schema_registry.stale = True
+                values.append(default)
+                continue
+            try:
+                value = getter(prop)
+            except (KeyError, TypeError, IndexError):
+                # La página no coincide con el esquema compilado
+                schema_registry.stale = True
+                value = default
+            if value is None or (result_types and (not isinstance(value, result_types) or
+                                                   (bool not in result_types and isinstance(value, bool)))):
+                value = default
+            values.append(value)
+        return values
+
+class SchemaRegistry:
+    def __init__(self):
+        self.extractor = PageExtractor(DEFAULT_SCHEMA)
+        self.stale = True  # Aún no se ha leído el esquema real
+    
+    def update(self, properties: Dict[str, Dict[str, Any]]) -> bool:
+        """Recompila el extractor con el esquema leído; devuelve si cambiaron las propiedades usadas"""
+        self.stale = False
+        extractor = PageExtractor(properties)
+        changed = extractor.signature != self.extractor.signature
+        # Siempre se guarda el nuevo: las opciones de select pueden cambiar sin cambiar la firma
+        self.extractor = extractor
+        if not changed:
+            return False
+        if self.extractor.missing:
+            print(f"⚠️ Campos sin propiedad compatible en Notion: {', '.join(self.extractor.missing)}")
+        return True
+
+# Registro global del esquema de la base de Brainrots
+schema_registry = SchemaRegistry()
@@ -0,0 +1,158 @@
+import re
+from bisect import bisect_left, bisect_right
+from difflib import get_close_matches
+from typing import Dict, List, Optional, Set, Iterable, Tuple
+
+TOKEN_RE = re.compile(r'\w+')
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+class SearchQuery:
+    def __init__(self, text: str = '', rareza: Optional[str] = None, efecto: Optional[str] = None,
+                 cuenta: Optional[str] = None, vendido: Optional[bool] = None,
+                 min_price: Optional[float] = None, max_price: Optional[float] = None,
+                 sort: Optional[str] = None, descending: bool = False):
+        self.text = text
+        self.rareza = rareza
+        self.efecto = efecto
+        self.cuenta = cuenta
+        self.vendido = vendido
+        self.min_price = min_price
+        self.max_price = max_price
+        # Campo de orden ('price' o 'name'); sin él se conserva el orden de la colección
+        self.sort = sort
+        self.descending = descending
+
+class SearchIndex:
+    """Índice invertido sobre una copia de la colección; se construye una vez por copia"""
+    
+    def __init__(self, brainrots: List):
+        self.brainrots = brainrots
+        self.tokens: Dict[str, Set[int]] = {}
+        self.rarezas: Dict[str, Set[int]] = {}
+        self.efectos: Dict[str, Set[int]] = {}
+        self.cuentas: Dict[str, Set[int]] = {}
+        self.vendido: Dict[bool, Set[int]] = {True: set(), False: set()}
+        
+        priced = []
+        labels: Dict[str, Dict[str, str]] = {'name': {}, 'rareza': {}, 'efecto': {}}
+        for position, brainrot in enumerate(brainrots):
+            labels['name'].setdefault(brainrot.name.lower(), brainrot.name)
+            for rareza in brainrot.rarezas:
+                labels['rareza'].setdefault(rareza.lower(), rareza)
+            for efecto in brainrot.efectos:
+                labels['efecto'].setdefault(efecto.lower(), efecto)
+            for token in tokenize(brainrot.name):
+                self.tokens.setdefault(token, set()).add(position)
+            for rareza in brainrot.rarezas:
+                self.rarezas.setdefault(rareza.lower(), set()).add(position)
+            for efecto in brainrot.efectos:
+                self.efectos.setdefault(efecto.lower(), set()).add(position)
+            if brainrot.cuenta_id:
+                self.cuentas.setdefault(brainrot.cuenta_id, set()).add(position)
+            self.vendido[bool(brainrot.vendido)].add(position)
+            if brainrot.price is not None:
+                priced.append((brainrot.price, position))
+        
+        # Vocabulario ordenado para búsquedas por prefijo con bisect
+        self.vocabulary = sorted(self.tokens)
+        priced.sort()
+        self.prices = [price for price, _ in priced]
+        self.price_positions = [position for _, position in priced]
+        
+        # Listas ordenadas (minúsculas, texto original) para autocompletar sin tocar Notion
+        self.completions: Dict[str, List[Tuple[str, str]]] = {
+            kind: sorted(values.items()) for kind, values in labels.items()
+        }
+    
+    def set_cuenta_names(self, names: Dict[str, str]):
+        self.completions['cuenta'] = sorted({name.lower(): name for name in names.values()}.items())
+    
+    def complete(self, kind: str, current: str, limit: int = 25) -> List[str]:
+        """Sugerencias por prefijo y, si no llegan al límite, por subcadena"""
+        entries = self.completions.get(kind, [])
+        current = current.lower()
+        start = bisect_left(entries, (current,))
+        
+        suggestions = []
+        for lower, label in entries[start:]:
+            if not lower.startswith(current) or len(suggestions) >= limit:
+                break
+            suggestions.append(label)
+        
+        if current and len(suggestions) < limit:
+            for lower, label in entries:
+                if current in lower and not lower.startswith(current):
+                    suggestions.append(label)
+                    if len(suggestions) >= limit:
+                        break
+        return suggestions
+    
+    def match_token(self, token: str) -> Set[int]:
+        start = bisect_left(self.vocabulary, token)
+        end = bisect_left(self.vocabulary, token + '\uffff')
+        matches = self.vocabulary[start:end]
+        if not matches:
+            # Sin coincidencia por prefijo: tolerar erratas
+            matches = get_close_matches(token, self.vocabulary, n=3, cutoff=0.75)
+        
+        positions: Set[int] = set()
+        for match in matches:
+            positions |= self.tokens[match]
+        return positions
+    
+    def match_label(self, labels: Dict[str, Set[int]], value: str) -> Set[int]:
+        value = value.lower()
+        if value in labels:
+            return labels[value]
+        positions: Set[int] = set()
+        for label, label_positions in labels.items():
+            if value in label:
+                positions |= label_positions
+        return positions
+    
+    def match_price(self, min_price: Optional[float], max_price: Optional[float]) -> Set[int]:
+        start = 0 if min_price is None else bisect_left(self.prices, min_price)
+        end = len(self.prices) if max_price is None else bisect_right(self.prices, max_price)
+        return set(self.price_positions[start:end])
+    
+    def search(self, query: SearchQuery, cuenta_ids: Optional[Iterable[str]] = None) -> List:
+        """Aplica todos los filtros de la consulta; cuenta_ids son las cuentas que coinciden por nombre"""
+        candidates: List[Set[int]] = [self.match_token(token) for token in tokenize(query.text)]
+        if query.rareza:
+            candidates.append(self.match_label(self.rarezas, query.rareza))
+        if query.efecto:
+            candidates.append(self.match_label(self.efectos, query.efecto))
+        if cuenta_ids is not None:
+            positions: Set[int] = set()
+            for cuenta_id in cuenta_ids:
+                positions |= self.cuentas.get(cuenta_id, set())
+            candidates.append(positions)
+        if query.vendido is not None:
+            candidates.append(self.vendido[query.vendido])
+        if query.min_price is not None or query.max_price is not None:
+            candidates.append(self.match_price(query.min_price, query.max_price))
+        
+        if not candidates:
+            return self.sort_results(list(self.brainrots), query)
+        
+        # Intersectar empezando por el conjunto más pequeño
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for positions in candidates[1:]:
+            result &= positions
+            if not result:
+                break
+        return self.sort_results([self.brainrots[position] for position in sorted(result)], query)
+    
+    @staticmethod
+    def sort_results(results: List, query: SearchQuery) -> List:
+        if query.sort == 'price':
+            # Los que no tienen precio van siempre al final
+            priced = [br for br in results if br.price is not None]
+            priced.sort(key=lambda br: br.price, reverse=query.descending)
+            return priced + [br for br in results if br.price is None]
+        if query.sort == 'name':
+            results.sort(key=lambda br: br.name.lower(), reverse=query.descending)
+        return results
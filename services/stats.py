@@ -0,0 +1,131 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional
+
+class StatsEngine:
+    """Agregados del dashboard, mantenidos al añadir, cambiar o quitar Brainrots"""
+    
+    def __init__(self):
+        self.total = 0
+        self.vendidos = 0
+        self.total_value = 0.0
+        self.rareza_count: Counter = Counter()
+        self.efectos_count: Counter = Counter()
+        self.cuenta_count: Counter = Counter()
+        self.cuenta_value: Counter = Counter()
+        # Por cuenta: vendidos, valor de lo que sigue disponible y reparto de rarezas
+        self.cuenta_vendidos: Counter = Counter()
+        self.cuenta_disponible_value: Counter = Counter()
+        self.cuenta_rarezas: Dict[str, Counter] = {}
+        self.prices: List[float] = []  # Siempre ordenada, para percentiles
+    
+    @classmethod
+    def build(cls, brainrots: Iterable) -> 'StatsEngine':
+        stats = cls()
+        for brainrot in brainrots:
+            stats._apply(brainrot, 1)
+            if brainrot.price is not None:
+                stats.prices.append(brainrot.price)
+        stats.prices.sort()
+        return stats
+    
+    def copy(self) -> 'StatsEngine':
+        stats = StatsEngine()
+        stats.total = self.total
+        stats.vendidos = self.vendidos
+        stats.total_value = self.total_value
+        stats.rareza_count = self.rareza_count.copy()
+        stats.efectos_count = self.efectos_count.copy()
+        stats.cuenta_count = self.cuenta_count.copy()
+        stats.cuenta_value = self.cuenta_value.copy()
+        stats.cuenta_vendidos = self.cuenta_vendidos.copy()
+        stats.cuenta_disponible_value = self.cuenta_disponible_value.copy()
+        stats.cuenta_rarezas = {cuenta_id: rarezas.copy() for cuenta_id, rarezas in self.cuenta_rarezas.items()}
+        stats.prices = list(self.prices)
+        return stats
+    
+    def _apply(self, brainrot, sign: int):
+        price = brainrot.price or 0
+        self.total += sign
+        self.total_value += sign * price
+        if brainrot.vendido:
+            self.vendidos += sign
+        for rareza in brainrot.rarezas:
+            self._bump(self.rareza_count, rareza, sign)
+        for efecto in brainrot.efectos:
+            self._bump(self.efectos_count, efecto, sign)
+        if brainrot.cuenta_id:
+            self._apply_cuenta(brainrot, sign, price)
+    
+    def _apply_cuenta(self, brainrot, sign: int, price: float):
+        cuenta_id = brainrot.cuenta_id
+        self.cuenta_value[cuenta_id] += sign * price
+        if brainrot.vendido:
+            self._bump(self.cuenta_vendidos, cuenta_id, sign)
+        else:
+            self.cuenta_disponible_value[cuenta_id] += sign * price
+        rarezas = self.cuenta_rarezas.setdefault(cuenta_id, Counter())
+        for rareza in brainrot.rarezas:
+            self._bump(rarezas, rareza, sign)
+        
+        if not self._bump(self.cuenta_count, cuenta_id, sign):
+            # Cuenta sin Brainrots: se quitan todos sus agregados
+            del self.cuenta_value[cuenta_id]
+            self.cuenta_disponible_value.pop(cuenta_id, None)
+            self.cuenta_vendidos.pop(cuenta_id, None)
+            self.cuenta_rarezas.pop(cuenta_id, None)
+    
+    @staticmethod
+    def _bump(counter: Counter, key: str, delta: int) -> bool:
+        """Suma delta a la clave y la elimina si llega a cero; devuelve si sigue presente"""
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+            return False
+        return True
+    
+    def add(self, brainrot):
+        self._apply(brainrot, 1)
+        if brainrot.price is not None:
+            insort(self.prices, brainrot.price)
+    
+    def remove(self, brainrot):
+        self._apply(brainrot, -1)
+        if brainrot.price is not None:
+            index = bisect_left(self.prices, brainrot.price)
+            if index < len(self.prices) and self.prices[index] == brainrot.price:
+                del self.prices[index]
+    
+    def update(self, old, new):
+        self.remove(old)
+        self.add(new)
+    
+    def percentile(self, percent: float) -> Optional[float]:
+        if not self.prices:
+            return None
+        index = round(percent / 100 * (len(self.prices) - 1))
+        return self.prices[index]
+    
+    def cuenta_summary(self, cuenta_id: str) -> Dict[str, Any]:
+        count = self.cuenta_count.get(cuenta_id, 0)
+        vendidos = self.cuenta_vendidos.get(cuenta_id, 0)
+        return {
+            'total': count,
+            'vendidos': vendidos,
+            'disponibles': count - vendidos,
+            'total_value': self.cuenta_value.get(cuenta_id, 0.0),
+            'disponible_value': self.cuenta_disponible_value.get(cuenta_id, 0.0),
+            'rarezas': self.cuenta_rarezas.get(cuenta_id, Counter()).most_common(),
+        }
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'vendidos': self.vendidos,
+            'disponibles': self.total - self.vendidos,
+            'total_value': self.total_value,
+            'rarezas': self.rareza_count.most_common(),
+            'efectos': self.efectos_count.most_common(),
+            'cuentas': self.cuenta_value.most_common(),
+            'percentiles': {p: self.percentile(p) for p in (25, 50, 75, 90)},
+        }
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Dict, Any, List, Sequence
+from models.brainrot import Brainrot
+from services.notion_client import NotionClient, notion_client
+from services.schema import schema_registry
+from services.pipeline import build_snapshot
+from utils.cache import Snapshot, cache_manager
+from utils.singleflight import request_coalescer
+
+SCHEMA_KEY = 'schema'
+
+class SyncEngine:
+    """Sincroniza la caché de Brainrots descargando solo las páginas editadas"""
+    
+    def __init__(self, client: NotionClient):
+        self.client = client
+        # El esquema también lo puede leer el planificador de consultas antes que la sincronización
+        self.schema_changed = False
+    
+    async def load_schema(self) -> bool:
+        """Lee el esquema de la base y recompila el extractor; devuelve si cambió"""
+        database = await self.client.get_database()
+        if schema_registry.update(database.get('properties', {})):
+            self.schema_changed = True
+            return True
+        return False
+    
+    async def sync(self) -> Snapshot:
+        full_sync_due = not cache_manager.has_brainrot_data() or cache_manager.is_full_sync_due()
+        
+        if full_sync_due or schema_registry.stale:
+            await request_coalescer.do(SCHEMA_KEY, self.load_schema)
+        
+        # Con otro esquema los registros guardados ya no son fiables
+        if full_sync_due or self.schema_changed:
+            # Reconciliación completa: también detecta páginas borradas
+            snapshot = await self.client.fetch_database()
+            self.schema_changed = False
+            return snapshot
+        return await self.sync_changes()
+    
+    async def sync_changes(self) -> Snapshot:
+        previous = cache_manager.snapshot
+        cursor = previous.sync_cursor
+        # on_or_after: Notion redondea last_edited_time al minuto
+        body = {
+            'filter': {
+                'timestamp': 'last_edited_time',
+                'last_edited_time': {'on_or_after': cursor}
+            }
+        }
+        
+        changed: List[Dict[str, Any]] = []
+        async for batch in self.client.iter_database(body=body):
+            changed.extend(batch)
+        
+        # Agregados y clasificaciones se actualizan solo con las filas cambiadas, sobre copias
+        stats = previous.stats.copy()
+        leaderboard = previous.leaderboard.copy()
+        brainrots = await asyncio.to_thread(self.merge, previous.records, changed, (stats, leaderboard))
+        return await build_snapshot(brainrots, stats, leaderboard, full=False)
+    
+    @staticmethod
+    def merge(brainrots: Sequence[Brainrot], changed: List[Dict[str, Any]],
+              aggregates: Sequence[Any] = ()) -> List[Brainrot]:
+        """Combina las páginas cambiadas por id sin modificar la copia anterior y actualiza los agregados"""
+        merged = list(brainrots)
+        positions = {br.id: i for i, br in enumerate(merged)}
+        removed = set()
+        
+        for page in changed:
+            page_id = page['id']
+            position = positions.get(page_id)
+            if page.get('archived') or page.get('in_trash'):
+                if position is not None and page_id not in removed:
+                    removed.add(page_id)
+                    for aggregate in aggregates:
+                        aggregate.remove(merged[position])
+            elif position is not None:
+                brainrot = Brainrot.from_notion(page)
+                for aggregate in aggregates:
+                    aggregate.update(merged[position], brainrot)
+                merged[position] = brainrot
+            else:
+                brainrot = Brainrot.from_notion(page)
+                for aggregate in aggregates:
+                    aggregate.add(brainrot)
+                positions[page_id] = len(merged)
+                merged.append(brainrot)
+        
+        if removed:
+            merged = [br for br in merged if br.id not in removed]
+        return merged
+
+# Instancia global del motor de sincronización
+sync_engine = SyncEngine(notion_client)
@@ -0,0 +1,83 @@
+import asyncio
+import aiohttp
+from typing import Dict, Any, Optional
+from config import Config
+
+def request_timeout(total: Optional[float] = None) -> aiohttp.ClientTimeout:
+    return aiohttp.ClientTimeout(
+        total=total or Config.NOTION_REQUEST_TIMEOUT_SECONDS,
+        connect=Config.NOTION_CONNECT_TIMEOUT_SECONDS,
+        sock_read=Config.NOTION_READ_TIMEOUT_SECONDS
+    )
+
+class PooledTransport:
+    """Sesión HTTP compartida con un pool de conexiones keep-alive y métricas del pool"""
+    
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.connector: Optional[aiohttp.TCPConnector] = None
+        self.lock = asyncio.Lock()
+        self.stats: Dict[str, float] = {
+            'connections_created': 0,
+            'connections_reused': 0,
+            'acquire_waits': 0,
+            'acquire_wait_seconds': 0.0,
+        }
+    
+    async def get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            # Varias primeras llamadas a la vez no deben crear varias sesiones
+            async with self.lock:
+                if self.session is None or self.session.closed:
+                    self.session = self._create_session()
+        return self.session
+    
+    def _create_session(self) -> aiohttp.ClientSession:
+        self.connector = aiohttp.TCPConnector(
+            limit=Config.NOTION_POOL_SIZE,
+            limit_per_host=Config.NOTION_POOL_SIZE,
+            keepalive_timeout=Config.NOTION_KEEPALIVE_SECONDS,
+            ttl_dns_cache=Config.NOTION_DNS_CACHE_SECONDS,
+            enable_cleanup_closed=True
+        )
+        
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_queued_start.append(self._on_queued_start)
+        trace.on_connection_queued_end.append(self._on_queued_end)
+        trace.on_connection_create_end.append(self._on_connection_created)
+        trace.on_connection_reuseconn.append(self._on_connection_reused)
+        
+        return aiohttp.ClientSession(headers=self.headers, connector=self.connector,
+                                     timeout=request_timeout(), trace_configs=[trace])
+    
+    async def _on_queued_start(self, session, ctx, params):
+        ctx.queued_at = asyncio.get_running_loop().time()
+    
+    async def _on_queued_end(self, session, ctx, params):
+        self.stats['acquire_waits'] += 1
+        self.stats['acquire_wait_seconds'] += asyncio.get_running_loop().time() - ctx.queued_at
+    
+    async def _on_connection_created(self, session, ctx, params):
+        self.stats['connections_created'] += 1
+    
+    async def _on_connection_reused(self, session, ctx, params):
+        self.stats['connections_reused'] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.stats)
+        connector = self.connector
+        if connector is not None and not connector.closed:
+            # aiohttp no expone el estado del pool públicamente
+            stats['active'] = len(getattr(connector, '_acquired', ()))
+            stats['idle'] = sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+        else:
+            stats['active'] = stats['idle'] = 0
+        stats['limit'] = Config.NOTION_POOL_SIZE
+        return stats
+    
+    async def close(self):
+        if self.session:
+            await self.session.close()
+            self.session = None
+            self.connector = None
@@ -1,38 +1,98 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Any, NamedTuple, Optional, Tuple, TYPE_CHECKING
 from config import Config
 
+if TYPE_CHECKING:
+    from services.analytics import Analytics
+    from services.leaderboard import PriceLeaderboard
+    from services.search import SearchIndex
+    from services.stats import StatsEngine
+
+class Snapshot(NamedTuple):
+    """Copia inmutable y versionada de la colección; se sustituye entera, nunca se modifica"""
+    version: int
+    records: Tuple[Any, ...]
+    stats: 'StatsEngine'
+    index: 'SearchIndex'
+    leaderboard: 'PriceLeaderboard'
+    analytics: 'Analytics'
+    last_update: datetime
+    last_full_sync: Optional[datetime]
+    sync_cursor: Optional[str]
+
 class CacheManager:
     def __init__(self):
-        self.relation_cache: Dict[str, Any] = {}
-        self.brainrot_cache: Dict[str, Any] = {
-            'last_update': None,
-            'data': None,
-            'stats': None
-        }
+        # id -> (momento de guardado, valor), ordenado del menos al más usado
+        self.relation_cache: "OrderedDict[str, Tuple[datetime, Any]]" = OrderedDict()
+        self.snapshot: Optional[Snapshot] = None
+        self.version = 0
+    
+    def has_brainrot_data(self) -> bool:
+        return self.snapshot is not None
     
     def is_brainrot_cache_valid(self) -> bool:
-        return (self.brainrot_cache['data'] is not None and 
-                self.brainrot_cache['last_update'] is not None and
-                (datetime.now() - self.brainrot_cache['last_update'] < 
-                 timedelta(minutes=Config.CACHE_DURATION_MINUTES)))
+        return (self.snapshot is not None and
+                datetime.now() - self.snapshot.last_update < timedelta(minutes=Config.CACHE_DURATION_MINUTES))
     
-    def update_brainrot_cache(self, data: Any):
-        self.brainrot_cache['data'] = data
-        self.brainrot_cache['last_update'] = datetime.now()
+    def can_serve_stale(self) -> bool:
+        """Hay una copia caducada que se puede servir mientras se refresca"""
+        return Config.CACHE_STALE_WHILE_REVALIDATE and self.has_brainrot_data()
+    
+    def publish_snapshot(self, records: Tuple[Any, ...], stats: 'StatsEngine', index: 'SearchIndex',
+                         leaderboard: 'PriceLeaderboard', analytics: 'Analytics', full: bool = True, last_update: Optional[datetime] = None,
+                         last_full_sync: Optional[datetime] = None) -> Snapshot:
+        """Publica una copia nueva con una sola asignación; quien tenga la anterior la conserva"""
+        last_update = last_update or datetime.now()
+        if last_full_sync is None:
+            if full:
+                last_full_sync = last_update
+            elif self.snapshot is not None:
+                last_full_sync = self.snapshot.last_full_sync
+        
+        # Marca de la edición más reciente vista, punto de partida de la siguiente sincronización
+        sync_cursor = max((br.last_edited for br in records if br.last_edited), default=None)
+        self.version += 1
+        snapshot = Snapshot(self.version, records, stats, index, leaderboard, analytics,
+                            last_update, last_full_sync, sync_cursor)
+        self.snapshot = snapshot
+        return snapshot
+    
+    def is_full_sync_due(self) -> bool:
+        snapshot = self.snapshot
+        return (snapshot is None or snapshot.last_full_sync is None or snapshot.sync_cursor is None or
+                datetime.now() - snapshot.last_full_sync >= timedelta(minutes=Config.SYNC_FULL_RECONCILE_MINUTES))
     
     def get_relation(self, key: str) -> Optional[Any]:
-        return self.relation_cache.get(key)
+        """Relación guardada aunque haya caducado: con Notion caído se sigue mostrando el nombre"""
+        entry = self.relation_cache.get(key)
+        if entry is None:
+            return None
+        self.relation_cache.move_to_end(key)
+        return entry[1]
+    
+    def relation_expiring(self, key: str, within_minutes: float = 0) -> bool:
+        """La relación falta, ha caducado o caducará en los próximos minutos"""
+        entry = self.relation_cache.get(key)
+        if entry is None:
+            return True
+        ttl = timedelta(minutes=Config.RELATION_CACHE_TTL_MINUTES - within_minutes)
+        return datetime.now() - entry[0] >= ttl
     
-    def set_relation(self, key: str, value: Any):
-        self.relation_cache[key] = value
+    def set_relation(self, key: str, value: Any, stored_at: Optional[datetime] = None):
+        # stored_at permite restaurar una relación guardada sin rejuvenecerla
+        # El tamaño solo lo limita el LRU; la caducidad solo decide qué volver a pedir
+        self.relation_cache[key] = (stored_at or datetime.now(), value)
+        self.relation_cache.move_to_end(key)
+        while len(self.relation_cache) > Config.RELATION_CACHE_MAX_ENTRIES:
+            self.relation_cache.popitem(last=False)
     
     def clear_relation_cache(self):
-        self.relation_cache = {}
+        self.relation_cache = OrderedDict()
     
     def clear_all(self):
         self.clear_relation_cache()
-        self.brainrot_cache = {'last_update': None, 'data': None, 'stats': None}
+        self.snapshot = None
 
 # Instancia global de caché
-cache_manager = CacheManager()
\ No newline at end of file
+cache_manager = CacheManager()
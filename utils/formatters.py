@@ -1,5 +1,8 @@
-from typing import List, Any, Dict
+from datetime import datetime, timedelta
+from typing import List, Any, Dict, Optional, Tuple
+from config import Config
 from . import emojis
+from .render_cache import field_cache
 
 def format_price(price: float) -> str:
     return f"{price:,.0f} US$"
@@ -27,4 +30,43 @@ def format_efectos_list(efectos_list: List[str]) -> str:
 def format_status(vendido: bool) -> tuple:
     emoji = emojis.get_emoji('vendido') if vendido else emojis.get_emoji('disponible')
     text = "Vendido" if vendido else "Disponible"
-    return emoji, text
\ No newline at end of file
+    return emoji, text
+
+def format_snapshot_notice(age: Optional[timedelta], degraded: bool) -> Optional[str]:
+    """Aviso para el pie del embed cuando los datos no están al día"""
+    if age is None or (not degraded and age < timedelta(minutes=Config.CACHE_DURATION_MINUTES)):
+        return None
+    minutes = int(age.total_seconds() // 60)
+    text = f"Datos de hace {minutes} min" if minutes < 120 else f"Datos de hace {minutes // 60} h"
+    return f"{emojis.get_emoji('advertencia')} {text}" + (" (Notion no disponible)" if degraded else "")
+
+def snapshot_notice(snapshot) -> Optional[str]:
+    """Aviso de la copia con la que se respondió; None si los datos vienen directos de Notion"""
+    if snapshot is None:
+        return None
+    from services.notion_client import circuit_breaker
+    return format_snapshot_notice(datetime.now() - snapshot.last_update, circuit_breaker.is_open)
+
+def set_snapshot_footer(embed, snapshot, footer: str = ''):
+    """Pie del embed con el aviso de datos atrasados debajo, si lo hay"""
+    text = "\n".join(part for part in (footer, snapshot_notice(snapshot)) if part)
+    if text:
+        embed.set_footer(text=text)
+
+def format_brainrot_field(brainrot) -> Tuple[str, str]:
+    """Nombre y valor del campo de embed de un Brainrot"""
+    inputs = (brainrot.name, brainrot.price, tuple(brainrot.rarezas), tuple(brainrot.efectos), brainrot.vendido)
+    cached = field_cache.get(brainrot.id, brainrot.last_edited, inputs)
+    if cached is None:
+        precio = format_price(brainrot.price) if brainrot.price is not None else 'N/A'
+        status_emoji, status_text = format_status(brainrot.vendido)
+        value = (f"{emojis.get_emoji('dinero')} **{precio}**\n"
+                 f"{emojis.get_emoji('rareza')} **{format_rareza_list(brainrot.rarezas)}**\n"
+                 f"{emojis.get_emoji('efectos')} **{format_efectos_list(brainrot.efectos)}**\n"
+                 f"{status_emoji} **{status_text}**")
+        cached = (f"**{brainrot.name}**", value)
+        field_cache.put(brainrot.id, brainrot.last_edited, inputs, *cached)
+    
+    # La cuenta vive en otra página de Notion, así que no entra en la caché
+    name, value = cached
+    return name, f"{value}\n{emojis.get_emoji('cuenta')} **{brainrot.get_cuenta()}**"
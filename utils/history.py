@@ -0,0 +1,196 @@
+import asyncio
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import Config
+
+# Registros de tamaño fijo para poder recorrerlos con mmap y buscar por fecha con bisección
+# Cambio de una página: id (UUID), momento, precio (NaN si no tiene) y marcas
+DELTA = struct.Struct('<16sIdB3x')
+# Totales de la colección en cada sincronización
+TOTALS = struct.Struct('<IIIdd4x')
+
+SOLD = 1
+REMOVED = 2
+
+DAY = 24 * 3600
+HOUR = 3600
+
+def _page_key(page_id: str) -> Optional[bytes]:
+    try:
+        return uuid.UUID(page_id).bytes
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+class HistoryStore:
+    """Histórico de solo anexado: cambios por página y totales por sincronización"""
+    
+    def __init__(self, path: str):
+        self.deltas_path = f"{path}.deltas"
+        self.totals_path = f"{path}.totals"
+        # Último estado conocido por página, reconstruido del fichero la primera vez
+        self.state: Optional[Dict[bytes, Tuple[float, int]]] = None
+        self.last_compaction = 0.0
+        self.recorded_version = 0
+        self.lock = threading.Lock()
+    
+    def _scan(self, path: str, record: struct.Struct, start: int = 0) -> Iterator[tuple]:
+        """Recorre el fichero proyectado en memoria sin cargarlo entero"""
+        if not os.path.exists(path) or os.path.getsize(path) < record.size:
+            return
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = len(mm) - len(mm) % record.size  # Ignorar un registro final a medio escribir
+            for offset in range(start * record.size, end, record.size):
+                yield record.unpack_from(mm, offset)
+    
+    def _bisect_time(self, path: str, record: struct.Struct, timestamp: int, field: int) -> int:
+        """Índice del primer registro con fecha >= timestamp"""
+        if not os.path.exists(path):
+            return 0
+        count = os.path.getsize(path) // record.size
+        if count == 0:
+            return 0
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            low, high = 0, count
+            while low < high:
+                middle = (low + high) // 2
+                if record.unpack_from(mm, middle * record.size)[field] < timestamp:
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
+    
+    def _load_state(self) -> Dict[bytes, Tuple[float, int]]:
+        if self.state is None:
+            self.state = {}
+            for key, _, price, flags in self._scan(self.deltas_path, DELTA):
+                if flags & REMOVED:
+                    self.state.pop(key, None)
+                else:
+                    self.state[key] = (price, flags)
+        return self.state
+    
+    def record(self, brainrots) -> int:
+        """Anexa los cambios respecto al último estado y los totales actuales; devuelve cuántos cambios"""
+        with self.lock:
+            state = self._load_state()
+            now = int(time.time())
+            current: Dict[bytes, Tuple[float, int]] = {}
+            total = vendidos = 0
+            disponible_value = total_value = 0.0
+            
+            for brainrot in brainrots:
+                key = _page_key(brainrot.id)
+                if key is None:
+                    continue
+                price = math.nan if brainrot.price is None else float(brainrot.price)
+                current[key] = (price, SOLD if brainrot.vendido else 0)
+                total += 1
+                total_value += brainrot.price or 0
+                if brainrot.vendido:
+                    vendidos += 1
+                else:
+                    disponible_value += brainrot.price or 0
+            
+            deltas = []
+            for key, (price, flags) in current.items():
+                previous = state.get(key)
+                # NaN != NaN: comparar también si ambos precios faltan
+                if (previous is None or previous[1] != flags or
+                        (previous[0] != price and not (math.isnan(previous[0]) and math.isnan(price)))):
+                    deltas.append(DELTA.pack(key, now, price, flags))
+            for key in state.keys() - current.keys():
+                deltas.append(DELTA.pack(key, now, math.nan, REMOVED))
+            
+            self._append(self.deltas_path, DELTA, b''.join(deltas))
+            self._append(self.totals_path, TOTALS, TOTALS.pack(now, total, vendidos, disponible_value, total_value))
+            self.state = current
+            return len(deltas)
+    
+    @staticmethod
+    def _append(path: str, record: struct.Struct, data: bytes):
+        with open(path, 'ab') as f:
+            # Un registro a medio escribir (caída, disco lleno) desalinearía todos los siguientes
+            size = f.seek(0, os.SEEK_END)
+            if size % record.size:
+                f.truncate(size - size % record.size)
+            f.write(data)
+    
+    def totals(self, since: int) -> List[Tuple[int, int, int, float, float]]:
+        """(momento, total, vendidos, valor disponible, valor total) desde una fecha"""
+        start = self._bisect_time(self.totals_path, TOTALS, since, 0)
+        return list(self._scan(self.totals_path, TOTALS, start))
+    
+    def page_history(self, page_id: str, since: int = 0) -> List[Tuple[int, Optional[float], int]]:
+        """(momento, precio, marcas) de una página; recorre los cambios sin cargarlos en memoria"""
+        key = _page_key(page_id)
+        if key is None:
+            return []
+        start = self._bisect_time(self.deltas_path, DELTA, since, 1) if since else 0
+        return [(timestamp, None if math.isnan(price) else price, flags)
+                for record_key, timestamp, price, flags in self._scan(self.deltas_path, DELTA, start)
+                if record_key == key]
+    
+    def compaction_due(self) -> bool:
+        return time.time() - self.last_compaction >= Config.HISTORY_COMPACT_HOURS * 3600
+    
+    @staticmethod
+    def bucket(timestamp: int, now: int) -> Optional[int]:
+        """Tramo al que se reduce un registro antiguo; None si se conserva con resolución completa"""
+        age = now - timestamp
+        if age < Config.HISTORY_FULL_RESOLUTION_DAYS * DAY:
+            return None
+        if age < Config.HISTORY_HOURLY_DAYS * DAY:
+            return timestamp // HOUR
+        return timestamp // DAY
+    
+    def compact(self) -> Tuple[int, int]:
+        """Reduce la resolución de lo antiguo: el último registro de cada tramo (y página); devuelve los eliminados"""
+        with self.lock:
+            now = int(time.time())
+            removed_deltas = self._rewrite(self.deltas_path, DELTA,
+                                           lambda r: (r[0], self.bucket(r[1], now)), 1, now)
+            removed_totals = self._rewrite(self.totals_path, TOTALS,
+                                           lambda r: self.bucket(r[0], now), 0, now)
+            self.last_compaction = time.time()
+            return removed_deltas, removed_totals
+    
+    def _rewrite(self, path: str, record: struct.Struct, bucket_key, field: int, now: int) -> int:
+        # Se queda el último registro de cada tramo: al reconstruir el estado da el mismo resultado
+        latest: Dict[object, int] = {}
+        old = 0
+        for position, values in enumerate(self._scan(path, record)):
+            if self.bucket(values[field], now) is not None:
+                latest[bucket_key(values)] = position
+                old += 1
+        keep = set(latest.values())
+        removed = old - len(keep)
+        if not removed:
+            return 0
+        
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as out:
+            for position, values in enumerate(self._scan(path, record)):
+                if self.bucket(values[field], now) is None or position in keep:
+                    out.write(record.pack(*values))
+        os.replace(temp_path, path)
+        return removed
+    
+    async def record_async(self, snapshot) -> int:
+        # Una misma copia solo se anota una vez, p. ej. si Notion no respondió en este refresco
+        if snapshot is None or snapshot.version == self.recorded_version:
+            return 0
+        self.recorded_version = snapshot.version
+        # La copia es inmutable: se puede comparar y escribir en otro hilo
+        return await asyncio.to_thread(self.record, snapshot.records)
+    
+    async def compact_async(self) -> Tuple[int, int]:
+        return await asyncio.to_thread(self.compact)
+
+# Histórico global
+history_store = HistoryStore(Config.HISTORY_PATH)
@@ -0,0 +1,23 @@
+import asyncio
+import json
+from typing import Any
+from config import Config
+
+# orjson es opcional: si no está instalado se usa el decodificador estándar
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = 'orjson' if orjson else 'json'
+
+def loads(body: bytes) -> Any:
+    if orjson:
+        return orjson.loads(body)
+    return json.loads(body)
+
+async def decode(body: bytes) -> Any:
+    """Decodifica un cuerpo JSON; los grandes se decodifican en un hilo para no bloquear el bucle"""
+    if len(body) < Config.JSON_THREAD_THRESHOLD_BYTES:
+        return loads(body)
+    return await asyncio.to_thread(loads, body)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import sqlite3
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from config import Config
+from models.brainrot import Brainrot
+from services.pipeline import build_snapshot
+from utils.cache import CacheManager, cache_manager
+
+# Versión del formato de las filas guardadas; una copia de otra versión se ignora
+SNAPSHOT_VERSION = '3'
+
+class SnapshotStore:
+    """Guarda en SQLite la última copia de la caché para arrancar en caliente"""
+    
+    def __init__(self, path: str, cache: CacheManager):
+        self.path = path
+        self.cache = cache
+        self.saved_update: Optional[datetime] = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("CREATE TABLE IF NOT EXISTS pages (position INTEGER PRIMARY KEY, id TEXT, payload TEXT)")
+        # Las copias anteriores a la versión 3 no guardaban cuándo se obtuvo cada relación
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(relations)")]
+        if columns and 'stored_at' not in columns:
+            conn.execute("DROP TABLE relations")
+        conn.execute("CREATE TABLE IF NOT EXISTS relations (id TEXT PRIMARY KEY, stored_at TEXT, payload TEXT)")
+        return conn
+    
+    def collect(self) -> Optional[Tuple[Dict[str, Any], Sequence[Brainrot], List[Tuple[str, datetime, Any]]]]:
+        """Toma una copia de la caché; debe llamarse desde el bucle de eventos"""
+        snapshot = self.cache.snapshot
+        if snapshot is None or snapshot.last_update == self.saved_update:
+            return None
+        
+        meta = {
+            'version': SNAPSHOT_VERSION,
+            'last_update': snapshot.last_update.isoformat(),
+            'last_full_sync': snapshot.last_full_sync.isoformat() if snapshot.last_full_sync else None,
+        }
+        relations = [(key, stored_at, value) for key, (stored_at, value) in self.cache.relation_cache.items()]
+        # La copia es inmutable, se puede serializar en otro hilo
+        return meta, snapshot.records, relations
+    
+    def write(self, meta: Dict[str, Any], brainrots: Sequence[Brainrot],
+              relations: List[Tuple[str, datetime, Any]]):
+        pages = [(i, br.id, json.dumps(br.to_row(), separators=(',', ':')))
+                 for i, br in enumerate(brainrots)]
+        relation_rows = [(key, stored_at.isoformat(), json.dumps(value, separators=(',', ':')))
+                         for key, stored_at, value in relations]
+        
+        conn = self._connect()
+        try:
+            # Una sola transacción: o se guarda la copia completa o no cambia nada
+            with conn:
+                conn.execute("DELETE FROM meta")
+                conn.execute("DELETE FROM pages")
+                conn.execute("DELETE FROM relations")
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+                conn.executemany("INSERT INTO pages VALUES (?, ?, ?)", pages)
+                conn.executemany("INSERT INTO relations VALUES (?, ?, ?)", relation_rows)
+        finally:
+            conn.close()
+    
+    def read(self) -> Optional[Tuple[Dict[str, Any], List[Brainrot], List[Tuple[str, datetime, Any]]]]:
+        conn = self._connect()
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            if meta.get('version') != SNAPSHOT_VERSION or not meta.get('last_update'):
+                return None
+            brainrots = [Brainrot.from_row(json.loads(payload)) for (payload,) in
+                         conn.execute("SELECT payload FROM pages ORDER BY position")]
+            # Por rowid: mismo orden LRU en que se guardaron
+            relations = [(key, datetime.fromisoformat(stored_at), json.loads(payload)) for key, stored_at, payload in
+                         conn.execute("SELECT id, stored_at, payload FROM relations ORDER BY rowid")]
+        finally:
+            conn.close()
+        return meta, brainrots, relations
+    
+    async def restore(self, meta: Dict[str, Any], brainrots: List[Brainrot]):
+        # Conservar las fechas originales para que la copia se reconcilie al arrancar
+        last_update = datetime.fromisoformat(meta['last_update'])
+        last_full_sync = meta.get('last_full_sync')
+        await build_snapshot(brainrots, full=False, last_update=last_update,
+                             last_full_sync=datetime.fromisoformat(last_full_sync) if last_full_sync else None)
+        self.saved_update = last_update
+    
+    async def save_async(self) -> bool:
+        snapshot = self.collect()
+        if snapshot is None:
+            return False
+        try:
+            await asyncio.to_thread(self.write, *snapshot)
+        except Exception as e:
+            print(f"⚠️ Error guardando la copia local: {e}")
+            return False
+        self.saved_update = datetime.fromisoformat(snapshot[0]['last_update'])
+        return True
+    
+    async def load_async(self) -> int:
+        try:
+            snapshot = await asyncio.to_thread(self.read)
+        except Exception as e:
+            print(f"⚠️ Error cargando la copia local: {e}")
+            return 0
+        if snapshot is None:
+            return 0
+        meta, brainrots, relations = snapshot
+        # Con su fecha original: una relación antigua se vuelve a pedir en el siguiente refresco
+        for key, stored_at, value in relations:
+            self.cache.set_relation(key, value, stored_at)
+        # Las relaciones van antes para que el índice tenga ya los nombres de cuenta
+        await self.restore(meta, brainrots)
+        return len(brainrots)
+
+# Copia local global
+snapshot_store = SnapshotStore(Config.SNAPSHOT_PATH, cache_manager)
@@ -0,0 +1,52 @@
+import sys
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+from config import Config
+
+class FieldCache:
+    """Caché LRU de campos de embed ya formateados, limitada por memoria"""
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[Tuple[str, str, Hashable], Tuple[str, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _entry_size(name: str, value: str) -> int:
+        return sys.getsizeof(name) + sys.getsizeof(value)
+    
+    @staticmethod
+    def _key(page_id: str, last_edited: Optional[str], inputs: Hashable) -> Tuple[str, str, Hashable]:
+        # last_edited_time de Notion va redondeado al minuto: dos ediciones seguidas comparten
+        # fecha, así que los datos que se pintan también forman parte de la clave
+        return (page_id, last_edited or '', inputs)
+    
+    def get(self, page_id: str, last_edited: Optional[str], inputs: Hashable = ()) -> Optional[Tuple[str, str]]:
+        key = self._key(page_id, last_edited, inputs)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+    
+    def put(self, page_id: str, last_edited: Optional[str], inputs: Hashable, name: str, value: str):
+        key = self._key(page_id, last_edited, inputs)
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= self._entry_size(*previous)
+        
+        self.entries[key] = (name, value)
+        self.size += self._entry_size(name, value)
+        while self.size > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= self._entry_size(*evicted)
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {'entries': len(self.entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
+
+# Caché compartida por todos los comandos y paginadores
+field_cache = FieldCache(Config.FIELD_CACHE_MAX_BYTES)
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class SingleFlight:
+    """Agrupa las llamadas concurrentes con la misma clave en una sola petición"""
+    
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+    
+    def _counters(self, key: str) -> Dict[str, int]:
+        return self.stats.setdefault(key, {'hits': 0, 'misses': 0, 'coalesced': 0})
+    
+    # stats_key agrupa en un solo contador claves sin límite, como los ids de página
+    def record_hit(self, key: str, stats_key: Optional[str] = None):
+        self._counters(stats_key or key)['hits'] += 1
+    
+    def is_in_flight(self, key: str) -> bool:
+        return key in self.in_flight
+    
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]], stats_key: Optional[str] = None) -> Any:
+        counters = self._counters(stats_key or key)
+        task = self.in_flight.get(key)
+        if task is None:
+            counters['misses'] += 1
+            task = asyncio.ensure_future(func())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            counters['coalesced'] += 1
+        
+        # shield: si un llamador se cancela, el resto sigue esperando la misma petición
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: str, task: asyncio.Future):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Evita avisos de excepción no recuperada
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        return {key: dict(counters) for key, counters in self.stats.items()}
+
+# Registro global de peticiones en curso
+request_coalescer = SingleFlight()
@@ -0,0 +1,66 @@
+import shlex
+from discord import app_commands
+from typing import List, Optional, Tuple
+from models.brainrot import BrainrotCollection
+from services.search import SearchQuery
+
+YES = {'si', 'sí', 'yes', 'true', '1', 'vendido'}
+NO = {'no', 'false', '0', 'disponible'}
+SORT_FIELDS = {'precio': 'price', 'nombre': 'name'}
+
+def parse_price_range(value: str) -> Tuple[Optional[float], Optional[float]]:
+    """'100-500', '100-', '-500' o '250'"""
+    value = value.replace(',', '')
+    if '-' not in value:
+        price = float(value)
+        return price, price
+    low, high = value.split('-', 1)
+    return (float(low) if low else None), (float(high) if high else None)
+
+def parse_sort(value: str) -> Tuple[Optional[str], bool]:
+    """'precio', '-precio' (de mayor a menor) o 'nombre'"""
+    descending = value.startswith('-')
+    return SORT_FIELDS.get(value.lstrip('-').lower()), descending
+
+def parse_search_query(text: str) -> SearchQuery:
+    """Convierte 'nombre rareza:x efecto:y cuenta:z vendido:si precio:100-500 orden:-precio' en una consulta"""
+    query = SearchQuery()
+    words = []
+    try:
+        parts = shlex.split(text)
+    except ValueError:
+        parts = text.split()
+    
+    for part in parts:
+        key, sep, value = part.partition(':')
+        key = key.lower()
+        if not sep or not value:
+            words.append(part)
+        elif key == 'rareza':
+            query.rareza = value
+        elif key == 'efecto':
+            query.efecto = value
+        elif key == 'cuenta':
+            query.cuenta = value
+        elif key == 'vendido' and value.lower() in YES | NO:
+            query.vendido = value.lower() in YES
+        elif key == 'precio':
+            try:
+                query.min_price, query.max_price = parse_price_range(value)
+            except ValueError:
+                words.append(part)
+        elif key == 'orden' and parse_sort(value)[0]:
+            query.sort, query.descending = parse_sort(value)
+        else:
+            words.append(part)
+    
+    query.text = ' '.join(words)
+    return query
+
+def complete_choices(kind: str, current: str) -> List[app_commands.Choice[str]]:
+    """El autocompletado se dispara con cada tecla: solo se consulta el índice en memoria"""
+    collection = BrainrotCollection.cached()
+    if collection is None:
+        return []
+    return [app_commands.Choice(name=label[:100], value=label[:100])
+            for label in collection.get_index().complete(kind, current)]
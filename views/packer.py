@@ -0,0 +1,40 @@
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# Límites de Discord para un embed
+EMBED_MAX_FIELDS = 25
+FIELD_NAME_MAX = 256
+FIELD_VALUE_MAX = 1024
+EMBED_MAX_CHARS = 6000
+# Margen para el título y el pie (página, total y aviso de copia antigua)
+EMBED_RESERVED_CHARS = 512
+
+def fit_field(name: str, value: str) -> Tuple[str, str]:
+    """Recorta un campo a los límites de Discord"""
+    if len(name) > FIELD_NAME_MAX:
+        name = name[:FIELD_NAME_MAX - 1] + '…'
+    if len(value) > FIELD_VALUE_MAX:
+        value = value[:FIELD_VALUE_MAX - 1] + '…'
+    return name, value
+
+def field_size(name: str, value: str) -> int:
+    name, value = fit_field(name, value)
+    return len(name) + len(value)
+
+def pack_pages(records: Sequence[Any], measure: Optional[Callable[[Any], int]],
+               max_items: int = EMBED_MAX_FIELDS, start: int = 0) -> List[int]:
+    """Posiciones de inicio de cada página, llenando cada embed hasta el límite de campos o caracteres"""
+    max_items = max(1, min(max_items, EMBED_MAX_FIELDS))
+    budget = EMBED_MAX_CHARS - EMBED_RESERVED_CHARS
+    starts: List[int] = []
+    page_start, used = start, 0
+    
+    for position in range(start, len(records)):
+        size = measure(records[position]) if measure else 0
+        # Un registro siempre entra en una página vacía, aunque no quepa con otros
+        if position > page_start and (position - page_start >= max_items or used + size > budget):
+            starts.append(page_start)
+            page_start, used = position, 0
+        used += size
+    
+    starts.append(page_start)
+    return starts
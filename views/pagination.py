@@ -1,53 +1,147 @@
 import discord
-from discord.ui import Button, View
-from typing import List
+from discord.ui import Button, View, Modal, TextInput
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Callable, List, Sequence, Any, Optional
+from views.packer import EMBED_MAX_FIELDS, pack_pages
 
 class AdvancedPaginationView(View):
-    def __init__(self, pages: List[discord.Embed], timeout: int = 180):
+    """Paginador que solo construye el embed de la página que se está viendo"""
+    
+    def __init__(self, records: Sequence[Any], render_page: Callable[[Sequence[Any]], discord.Embed],
+                 items_per_page: int = EMBED_MAX_FIELDS, timeout: int = 180, cache_size: int = 4,
+                 notice: Optional[str] = None, measure: Optional[Callable[[Any], int]] = None,
+                 label: Optional[Callable[[Any], str]] = None):
         super().__init__(timeout=timeout)
-        self.pages = pages
+        # La lista de registros puede crecer mientras se siguen cargando datos
+        self.records = records
+        self.render_page = render_page
+        self.items_per_page = items_per_page
+        # Tamaño en caracteres de cada registro ya renderizado; sin él solo cuenta el número de campos
+        self.measure = measure
+        # Texto por el que se puede saltar a la página de un registro
+        self.label = label
+        self.page_starts: List[int] = []
+        self.packed = 0
+        self.cache_size = cache_size
+        self.rendered: "OrderedDict[tuple, discord.Embed]" = OrderedDict()
         self.current_page = 0
-        self.total_pages = len(pages)
         self.message = None
-        
-    async def update_embed(self, interaction: discord.Interaction):
-        embed = self.pages[self.current_page]
+        # Aviso opcional para el pie, p. ej. la antigüedad de los datos en modo degradado
+        self.notice = notice
+    
+    def pack(self):
+        """Reparte los registros nuevos; solo se vuelve a empaquetar desde la última página"""
+        if self.page_starts and self.packed == len(self.records):
+            return
+        start = self.page_starts.pop() if self.page_starts else 0
+        self.page_starts.extend(pack_pages(self.records, self.measure, self.items_per_page, start))
+        self.packed = len(self.records)
+    
+    @property
+    def total_pages(self) -> int:
+        self.pack()
+        return len(self.page_starts)
+    
+    def page_of(self, position: int) -> int:
+        self.pack()
+        return max(0, bisect_right(self.page_starts, position) - 1)
+    
+    def find_page(self, text: str) -> Optional[int]:
+        """Página del primer registro cuyo texto empieza por (o contiene) el buscado"""
+        if self.label is None:
+            return None
+        text = text.lower()
+        labels = [self.label(record).lower() for record in self.records]
+        for matches in (str.startswith, str.__contains__):
+            for position, label in enumerate(labels):
+                if matches(label, text):
+                    return self.page_of(position)
+        return None
+    
+    def get_page(self, index: int) -> discord.Embed:
+        self.pack()
+        start = self.page_starts[index]
+        end = self.page_starts[index + 1] if index + 1 < len(self.page_starts) else len(self.records)
+        # La clave incluye el final: una última página incompleta se vuelve a generar al crecer
+        key = (start, end)
+        embed = self.rendered.get(key)
+        if embed is None:
+            embed = self.render_page(self.records[start:end])
+            self.rendered[key] = embed
+            while len(self.rendered) > self.cache_size:
+                self.rendered.popitem(last=False)
+        else:
+            self.rendered.move_to_end(key)
+        return embed
+    
+    def prepare_page(self) -> discord.Embed:
+        embed = self.get_page(self.current_page)
         from utils.emojis import get_emoji
-        embed.set_footer(text=f"{get_emoji('reloj')} Página {self.current_page + 1}/{self.total_pages} • ⏹️ para cerrar")
+        footer = (f"{get_emoji('reloj')} Página {self.current_page + 1}/{self.total_pages} • "
+                  f"{get_emoji('brainrot')} Total: {len(self.records)} • ⏹️ para cerrar")
+        if self.notice:
+            footer += f"\n{self.notice}"
+        embed.set_footer(text=footer)
         
         self.previous_button.disabled = (self.current_page == 0)
         self.next_button.disabled = (self.current_page == self.total_pages - 1)
         self.first_button.disabled = (self.current_page == 0)
         self.last_button.disabled = (self.current_page == self.total_pages - 1)
+        return embed
         
+    async def update_embed(self, interaction: discord.Interaction):
+        embed = self.prepare_page()
         await interaction.response.edit_message(embed=embed, view=self)
     
+    async def go_to_page(self, interaction: discord.Interaction, index: int):
+        self.current_page = max(0, min(index, self.total_pages - 1))
+        await self.update_embed(interaction)
+    
     @discord.ui.button(emoji="⏮️", style=discord.ButtonStyle.secondary)
     async def first_button(self, interaction: discord.Interaction, button: Button):
         if self.current_page > 0:
-            self.current_page = 0
-            await self.update_embed(interaction)
+            await self.go_to_page(interaction, 0)
     
     @discord.ui.button(emoji="⬅️", style=discord.ButtonStyle.primary)
     async def previous_button(self, interaction: discord.Interaction, button: Button):
         if self.current_page > 0:
-            self.current_page -= 1
-            await self.update_embed(interaction)
+            await self.go_to_page(interaction, self.current_page - 1)
     
     @discord.ui.button(emoji="➡️", style=discord.ButtonStyle.primary)
     async def next_button(self, interaction: discord.Interaction, button: Button):
         if self.current_page < self.total_pages - 1:
-            self.current_page += 1
-            await self.update_embed(interaction)
+            await self.go_to_page(interaction, self.current_page + 1)
     
     @discord.ui.button(emoji="⏭️", style=discord.ButtonStyle.secondary)
     async def last_button(self, interaction: discord.Interaction, button: Button):
         if self.current_page < self.total_pages - 1:
-            self.current_page = self.total_pages - 1
-            await self.update_embed(interaction)
+            await self.go_to_page(interaction, self.total_pages - 1)
+    
+    @discord.ui.button(emoji="🔢", style=discord.ButtonStyle.secondary)
+    async def jump_button(self, interaction: discord.Interaction, button: Button):
+        await interaction.response.send_modal(JumpToPageModal(self))
     
     @discord.ui.button(emoji="⏹️", style=discord.ButtonStyle.danger)
     async def stop_button(self, interaction: discord.Interaction, button: Button):
         await interaction.response.defer()
         await interaction.delete_original_response()
-        self.stop()
\ No newline at end of file
+        self.stop()
+
+class JumpToPageModal(Modal, title="Ir a la página"):
+    page_number = TextInput(label="Número de página o nombre", placeholder="1", max_length=100)
+    
+    def __init__(self, pagination: AdvancedPaginationView):
+        super().__init__()
+        self.pagination = pagination
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        value = self.page_number.value.strip()
+        try:
+            index = int(value) - 1
+        except ValueError:
+            index = self.pagination.find_page(value) if value else None
+        if index is None:
+            await interaction.response.send_message("❌ Página o nombre no válido.", ephemeral=True)
+            return
+        await self.pagination.go_to_page(interaction, index)